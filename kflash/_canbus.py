@@ -0,0 +1,98 @@
+"""Katapult/Klipper CAN admin query over a raw SocketCAN socket.
+
+Speaks the same unassigned-node query as Katapult's ``flashtool.py -q``
+(admin id 0x3f0, replies on 0x3f1) so discovery.py can poll the bus without
+spawning a Python interpreter per query. Linux-only; :func:`open_admin_socket`
+raises OSError wherever SocketCAN is unavailable so callers can fall back to
+flashtool.py.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import time
+from typing import Callable, Optional
+
+from .models import DiscoveredCanDevice
+
+# Admin ids and commands, as defined in Katapult's scripts/flashtool.py
+CANBUS_ID_ADMIN = 0x3F0
+CANBUS_ID_ADMIN_RESP = 0x3F1
+_CMD_QUERY_UNASSIGNED = 0x00
+_RESP_NEED_NODEID = 0x20
+# Trailing byte of a NEED_NODEID reply: the set-nodeid command of the running app
+_APP_NAMES = {0x01: "Klipper", 0x11: "Katapult"}
+
+# struct can_frame from linux/can.h: id, dlc, 3 pad bytes, 8 data bytes
+_CAN_FRAME = struct.Struct("=IB3x8s")
+_CAN_SFF_MASK = 0x7FF
+
+
+def open_admin_socket(interface: str) -> socket.socket:
+    """Open a raw CAN socket on *interface* that only receives admin replies.
+
+    Raises:
+        OSError: If SocketCAN is unavailable or the interface cannot be bound.
+    """
+    family = getattr(socket, "AF_CAN", None)
+    if family is None:
+        raise OSError("SocketCAN is not available on this platform")
+    sock = socket.socket(family, socket.SOCK_RAW, socket.CAN_RAW)
+    try:
+        sock.setsockopt(
+            socket.SOL_CAN_RAW,
+            socket.CAN_RAW_FILTER,
+            struct.pack("=II", CANBUS_ID_ADMIN_RESP, _CAN_SFF_MASK),
+        )
+        sock.bind((interface,))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def parse_admin_response(frame: bytes) -> Optional[DiscoveredCanDevice]:
+    """Decode a NEED_NODEID admin reply frame; None for anything else."""
+    if len(frame) < _CAN_FRAME.size:
+        return None
+    can_id, dlc, payload = _CAN_FRAME.unpack_from(frame)
+    if can_id != CANBUS_ID_ADMIN_RESP:
+        return None
+    data = payload[:dlc]
+    if len(data) < 7 or data[0] != _RESP_NEED_NODEID:
+        return None
+    application = _APP_NAMES.get(data[7], "Unknown") if len(data) > 7 else "Unknown"
+    return DiscoveredCanDevice(uuid=data[1:7].hex(), application=application)
+
+
+def query(
+    sock: socket.socket,
+    listen: float,
+    stop: Optional[Callable[[DiscoveredCanDevice], bool]] = None,
+) -> list[DiscoveredCanDevice]:
+    """Send one unassigned-node query and collect replies for *listen* seconds.
+
+    Returns early once a reply satisfies *stop*, if given.
+
+    Raises:
+        OSError: If the socket fails (interface went away, bus-off, ...).
+    """
+    sock.send(_CAN_FRAME.pack(CANBUS_ID_ADMIN, 1, bytes([_CMD_QUERY_UNASSIGNED])))
+    found: dict[str, DiscoveredCanDevice] = {}
+    deadline = time.monotonic() + listen
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        sock.settimeout(remaining)
+        try:
+            frame = sock.recv(_CAN_FRAME.size)
+        except socket.timeout:
+            break
+        device = parse_admin_response(frame)
+        if device is not None and device.uuid not in found:
+            found[device.uuid] = device
+            if stop is not None and stop(device):
+                break
+    return list(found.values())
@@ -0,0 +1,130 @@
+"""Minimal rtnetlink client: one RTM_GETLINK dump for link type/state/qlen.
+
+Used by discovery.py's CAN checks so a preflight reads every interface's
+ARPHRD type, operstate and txqueuelen from a single netlink request instead
+of several sysfs files. Linux-only; :func:`link_snapshot` returns None
+wherever netlink is unavailable so callers can fall back to sysfs.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+from typing import NamedTuple, Optional
+
+# linux/netlink.h
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLM_F_REQUEST = 0x01
+_NLM_F_DUMP = 0x300
+
+# linux/rtnetlink.h
+_RTM_NEWLINK = 16
+_RTM_GETLINK = 18
+
+# linux/if_link.h attribute types
+_IFLA_IFNAME = 3
+_IFLA_TXQLEN = 13
+_IFLA_OPERSTATE = 16
+
+# linux/if.h: IF_OPER_UP (sysfs operstate "up")
+_IF_OPER_UP = 6
+
+_NLMSG_HDR = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+_IFINFOMSG = struct.Struct("=BxHiII")  # family, pad, type, index, flags, change
+_RTATTR = struct.Struct("=HH")  # len, type
+_U32 = struct.Struct("=I")
+
+_RECV_BUFSIZE = 65536
+
+
+class LinkInfo(NamedTuple):
+    """Per-interface attributes from an RTM_NEWLINK message."""
+
+    type: int  # ARPHRD_* hardware type
+    is_up: bool  # operstate == IF_OPER_UP
+    txqlen: Optional[int]
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def parse_links(data: bytes, links: dict[str, LinkInfo]) -> bool:
+    """Parse one recv() buffer of netlink messages into *links*.
+
+    Returns:
+        True once the dump is complete (NLMSG_DONE seen).
+
+    Raises:
+        OSError: If the kernel answered with an error message.
+    """
+    offset = 0
+    while offset + _NLMSG_HDR.size <= len(data):
+        msg_len, msg_type, _flags, _seq, _pid = _NLMSG_HDR.unpack_from(data, offset)
+        if msg_len < _NLMSG_HDR.size:
+            break
+        if msg_type == _NLMSG_DONE:
+            return True
+        if msg_type == _NLMSG_ERROR:
+            (errno,) = struct.unpack_from("=i", data, offset + _NLMSG_HDR.size)
+            raise OSError(-errno, "RTM_GETLINK failed")
+        if msg_type == _RTM_NEWLINK:
+            body = offset + _NLMSG_HDR.size
+            _family, if_type, _index, _flags, _change = _IFINFOMSG.unpack_from(data, body)
+            name = None
+            is_up = False
+            txqlen = None
+            attr = body + _IFINFOMSG.size
+            end = offset + msg_len
+            while attr + _RTATTR.size <= end:
+                attr_len, attr_type = _RTATTR.unpack_from(data, attr)
+                if attr_len < _RTATTR.size:
+                    break
+                value = data[attr + _RTATTR.size : attr + attr_len]
+                if attr_type == _IFLA_IFNAME:
+                    name = value.split(b"\0", 1)[0].decode("ascii", "replace")
+                elif attr_type == _IFLA_OPERSTATE and value:
+                    is_up = value[0] == _IF_OPER_UP
+                elif attr_type == _IFLA_TXQLEN and len(value) >= _U32.size:
+                    (txqlen,) = _U32.unpack_from(value)
+                attr += _align(attr_len)
+            if name is not None:
+                links[name] = LinkInfo(if_type, is_up, txqlen)
+        offset += _align(msg_len)
+    return False
+
+
+def link_snapshot() -> Optional[dict[str, LinkInfo]]:
+    """Dump every network link via rtnetlink.
+
+    Returns:
+        Mapping of interface name -> LinkInfo, or None if netlink is
+        unavailable (non-Linux, sandboxed) or the request fails.
+    """
+    family = getattr(socket, "AF_NETLINK", None)
+    if family is None:
+        return None
+    links: dict[str, LinkInfo] = {}
+    try:
+        with socket.socket(family, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+            sock.settimeout(1.0)
+            sock.bind((0, 0))
+            payload = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+            header = _NLMSG_HDR.pack(
+                _NLMSG_HDR.size + len(payload),
+                _RTM_GETLINK,
+                _NLM_F_REQUEST | _NLM_F_DUMP,
+                1,
+                0,  # port id: let the kernel route the reply to this socket
+            )
+            sock.sendall(header + payload)
+            while True:
+                data = sock.recv(_RECV_BUFSIZE)
+                if not data:
+                    return None
+                if parse_links(data, links):
+                    break
+    except (OSError, struct.error):
+        return None
+    return links
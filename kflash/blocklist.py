@@ -8,9 +8,14 @@ registry. Imported by both the engine flash paths and the TUI screen builder.
 from __future__ import annotations
 
 import fnmatch
+import functools
+import re
+from typing import Optional
 
 from .discovery import SUPPORTED_PREFIXES
 
+_GLOB_META_RE = re.compile(r"[*?\[]")
+
 DEFAULT_BLOCKED_DEVICES = [
     ("usb-beacon_*", "Beacon probe (not a Klipper MCU)"),
 ]
@@ -20,36 +25,114 @@ def normalize_pattern(pattern: str) -> str:
     return pattern.strip().lower()
 
 
-def build_blocked_list(registry_data) -> list[tuple[str, str | None]]:
-    blocked: list[tuple[str, str | None]] = [
-        (pattern, reason) for pattern, reason in DEFAULT_BLOCKED_DEVICES
-    ]
-    for entry in getattr(registry_data, "blocked_devices", []):
-        blocked.append((entry.pattern, entry.reason))
+_DEFAULT_BLOCKED = tuple(
+    (normalize_pattern(pattern), reason) for pattern, reason in DEFAULT_BLOCKED_DEVICES
+)
+
+
+# (normalized glob, reason) per blocked pattern
+BlockedList = list[tuple[str, Optional[str]]]
+
+
+def build_blocked_list(registry_data) -> BlockedList:
+    """Default plus user-configured blocked patterns, normalized once.
+
+    Matching goes through the memoized helpers below, which compile each
+    distinct blocklist once and remember per-name/per-pattern answers.
+    """
+    blocked: BlockedList = list(_DEFAULT_BLOCKED)
+    blocked.extend(
+        (normalize_pattern(entry.pattern), entry.reason)
+        for entry in registry_data.blocked_devices or ()
+    )
     return blocked
 
 
-def blocked_reason_for_filename(
-    filename: str, blocked_list: list[tuple[str, str | None]]
-) -> str | None:
-    name = filename.lower()
-    for pattern, reason in blocked_list:
-        if fnmatch.fnmatch(name, normalize_pattern(pattern)):
-            return reason or "Blocked by policy"
-    return None
+def blocked_reason_for_filename(filename: str, blocked_list: BlockedList) -> str | None:
+    if not blocked_list:
+        return None
+    index = _first_blocked_match(
+        filename.lower(), tuple(pattern for pattern, _reason in blocked_list)
+    )
+    if index is None:
+        return None
+    return blocked_list[index][1] or "Blocked by policy"
+
 
+@functools.lru_cache(maxsize=256)
+def _first_blocked_match(name: str, patterns: tuple[str, ...]) -> Optional[int]:
+    """Index of the first of *patterns* matching *name*, or None.
 
-def blocked_reason_for_entry(entry, blocked_list: list[tuple[str, str | None]]) -> str | None:
+    Memoized: the same by-id names are checked against the same blocklist
+    on every dashboard refresh and flash/add/manage listing.
+    """
+    prefixes, prefix_indices, union = _blocked_matcher(patterns)
+    hit = None
+    if prefixes and name.startswith(prefixes):
+        hit = next(i for p, i in zip(prefixes, prefix_indices) if name.startswith(p))
+    if union is not None:
+        m = union.match(name)
+        if m is not None and m.lastgroup:
+            i = int(m.lastgroup[1:])
+            hit = i if hit is None else min(hit, i)
+    return hit
+
+
+@functools.lru_cache(maxsize=8)
+def _blocked_matcher(
+    patterns: tuple[str, ...],
+) -> tuple[tuple[str, ...], tuple[int, ...], Optional[re.Pattern[str]]]:
+    """Split blocked globs into literal prefixes and one regex alternation.
+
+    ``literal*`` patterns (all of DEFAULT_BLOCKED_DEVICES) become plain
+    prefixes, tested together by one ``str.startswith(tuple)``, with their
+    pattern indices alongside; the rest are joined into one alternation
+    whose group ``b<i>`` is pattern i. The lowest index hit across both
+    tiers is the one a linear scan would have reported.
+    """
+    prefixes: list[str] = []
+    indices: list[int] = []
+    globs = []
+    for i, pattern in enumerate(patterns):
+        if pattern.endswith("*") and not _GLOB_META_RE.search(pattern, 0, len(pattern) - 1):
+            prefixes.append(pattern[:-1])
+            indices.append(i)
+        else:
+            globs.append(f"(?P<b{i}>{fnmatch.translate(pattern)})")
+    union = re.compile("|".join(globs)) if globs else None
+    return tuple(prefixes), tuple(indices), union
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_regex(glob: str) -> re.Pattern[str]:
+    """Compiled, case-sensitive matcher for one glob (fnmatch.fnmatchcase)."""
+    return re.compile(fnmatch.translate(glob))
+
+
+def blocked_reason_for_entry(entry, blocked_list: BlockedList) -> str | None:
     # CAN devices have no serial_pattern -- they cannot match USB blocked patterns
     if entry.serial_pattern is None:
         return None
-    serial_pattern = entry.serial_pattern.lower()
-    for pattern, reason in blocked_list:
-        normalized = normalize_pattern(pattern)
-        if fnmatch.fnmatch(serial_pattern, normalized) or fnmatch.fnmatch(
-            normalized, serial_pattern
-        ):
+    return _entry_block_reason(entry.serial_pattern, tuple(blocked_list))
+
+
+@functools.lru_cache(maxsize=256)
+def _entry_block_reason(
+    serial_pattern: str, blocked: tuple[tuple[str, Optional[str]], ...]
+) -> str | None:
+    """blocked_reason_for_entry for one registered serial pattern.
+
+    Memoized per (pattern, blocklist): the lowercased pattern and the
+    bidirectional glob tests are computed once per registry entry rather
+    than on every flash/manage listing and dashboard refresh.
+    """
+    lowered = serial_pattern.lower()
+    registered = _glob_regex(lowered)
+    for normalized, reason in blocked:
+        # Either glob may cover the other: a blocked pattern matching the
+        # registered pattern, or the registered pattern matching the block
+        if _glob_regex(normalized).match(lowered) or registered.match(normalized):
             return reason or "Blocked by policy"
-    if not any(serial_pattern.startswith(prefix) for prefix in SUPPORTED_PREFIXES):
+    if not lowered.startswith(SUPPORTED_PREFIXES):
         return "Unsupported USB device"
     return None
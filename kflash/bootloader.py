@@ -9,15 +9,23 @@ device signature (MCU type + serial hex).
 Public API:
     enter_bootloader()         -- dispatcher, retry logic, stagger delay
     extract_device_signature() -- extract (mcu_type, serial_hex) from filename
+    reset_caches()             -- drop memoized lookups (tests)
 """
 
 from __future__ import annotations
 
+import ctypes
+import functools
+import importlib.util
 import os
 import re
+import select
+import shutil
+import sys
+import threading
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from . import runner
 from .decisions import (
@@ -41,8 +49,12 @@ SERIAL_DIR = "/dev/serial/by-id"
 # Default venv paths (sibling-directory convention on Raspberry Pi)
 DEFAULT_MOONRAKER_VENV = "~/moonraker-env"
 
-# Device signature regex: matches Klipper_ or katapult_ USB serial names
-_SIGNATURE_RE = re.compile(r"usb-(?:Klipper|katapult)_([a-zA-Z0-9]+)_([A-Fa-f0-9]+)")
+# Device signature regex: matches Klipper_ or katapult_ USB serial names.
+# by-id names are plain ASCII, so re.ASCII keeps the character classes on the
+# byte-class fast path.
+_SIGNATURE_RE = re.compile(
+    r"usb-(?:Klipper|katapult)_([a-zA-Z0-9]+)_([A-Fa-f0-9]+)", re.ASCII
+)
 
 
 # ---------------------------------------------------------------------------
@@ -50,11 +62,14 @@ _SIGNATURE_RE = re.compile(r"usb-(?:Klipper|katapult)_([a-zA-Z0-9]+)_([A-Fa-f0-9
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=1024)
 def extract_device_signature(filename: str) -> tuple[str, str] | None:
     """Extract (mcu_type, serial_hex) from a /dev/serial/by-id/ filename.
 
     Parses device filenames with ``Klipper_`` or ``katapult_`` prefix and
     returns the MCU type (lowercased) and hexadecimal serial identifier.
+    Results are memoized: the re-enumeration poll sees the same handful of
+    filenames on every tick.
 
     Args:
         filename: Device filename (basename only, not full path).
@@ -116,16 +131,7 @@ def enter_bootloader(
 
     method = device_entry.bootloader_method or "none"
 
-    # Method dispatch table
-    dispatch = {
-        "usb": _enter_usb,
-        "serial": _enter_serial,
-        "manual": _enter_manual,
-        "none": _enter_none,
-        "can": _enter_can,
-    }
-
-    handler = dispatch.get(method)
+    handler = _DISPATCH.get(method)
     if handler is None:
         return BootloaderResult(
             success=False,
@@ -133,10 +139,10 @@ def enter_bootloader(
             elapsed_seconds=time.monotonic() - start,
         )
 
+    args = (device_path, device_entry, klipper_dir, katapult_dir, stagger_delay, decider, batch)
+
     # First attempt
-    result = handler(
-        device_path, device_entry, klipper_dir, katapult_dir, stagger_delay, decider, batch
-    )
+    result = handler(*args)
 
     # Retry logic: offer one retry when re-enumeration fails on the interactive
     # single-device path (batch never retries). Runs inside the stopped window.
@@ -149,15 +155,7 @@ def enter_bootloader(
             )
         )
         if should_retry:
-            result = handler(
-                device_path,
-                device_entry,
-                klipper_dir,
-                katapult_dir,
-                stagger_delay,
-                decider,
-                batch,
-            )
+            result = handler(*args)
 
     result.elapsed_seconds = time.monotonic() - start
     return result
@@ -168,22 +166,30 @@ def enter_bootloader(
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=16)
 def get_klippy_env_python(klipper_dir: str) -> str:
     """Derive klippy-env Python interpreter path from klipper_dir.
 
     Uses the sibling-directory convention: if klipper_dir is ``~/klipper``,
-    looks for ``~/klippy-env/bin/python3``.
+    looks for ``~/klippy-env/bin/python3``.  Memoized per klipper_dir: the
+    venv layout does not change during a run (see :func:`reset_caches`).
 
     Args:
         klipper_dir: Path to the Klipper source directory (may contain ~).
 
     Returns:
-        Absolute path to the klippy-env python3 binary, or ``"python3"``
-        as fallback if the venv is not found.
+        Path to the klippy-env python3 binary (resolved through symlinks
+        only when the literal sibling is missing), or ``"python3"`` as
+        fallback if the venv is not found.
     """
-    klipper_path = Path(klipper_dir).expanduser().resolve()
-    klippy_env = klipper_path.parent / "klippy-env"
-    python3 = klippy_env / "bin" / "python3"
+    # The unresolved sibling is the common case; realpath() (which stats every
+    # component) is only needed when klipper_dir is a symlink into a tree
+    # whose real parent holds the venv.
+    klipper_path = Path(klipper_dir).expanduser()
+    python3 = klipper_path.parent / "klippy-env" / "bin" / "python3"
+    if python3.is_file():
+        return str(python3)
+    python3 = klipper_path.resolve().parent / "klippy-env" / "bin" / "python3"
     if python3.is_file():
         return str(python3)
     return "python3"
@@ -194,11 +200,12 @@ def get_klippy_env_python(klipper_dir: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=16)
 def _get_moonraker_env_python(klipper_dir: str) -> str:
     """Derive Moonraker venv Python path from klipper_dir's parent.
 
     Serial bootloader entry uses flashtool.py which requires pyserial.
-    The Moonraker venv has pyserial installed.
+    The Moonraker venv has pyserial installed.  Memoized per klipper_dir.
 
     Args:
         klipper_dir: Path to the Klipper source directory.
@@ -206,9 +213,11 @@ def _get_moonraker_env_python(klipper_dir: str) -> str:
     Returns:
         Path to Moonraker venv python3, or ``"python3"`` as fallback.
     """
-    klipper_path = Path(klipper_dir).expanduser().resolve()
-    moonraker_env = klipper_path.parent / "moonraker-env"
-    discovered = discover_python_path(str(moonraker_env))
+    klipper_path = Path(klipper_dir).expanduser()
+    discovered = discover_python_path(str(klipper_path.parent / "moonraker-env"))
+    if discovered:
+        return discovered
+    discovered = discover_python_path(str(klipper_path.resolve().parent / "moonraker-env"))
     if discovered:
         return discovered
     # Also try the default path
@@ -217,6 +226,104 @@ def _get_moonraker_env_python(klipper_dir: str) -> str:
     return discovered if discovered else "python3"
 
 
+# ---------------------------------------------------------------------------
+# Helper: reset_caches
+# ---------------------------------------------------------------------------
+
+
+def reset_caches() -> None:
+    """Drop memoized venv lookups and device signatures (test isolation)."""
+    get_klippy_env_python.cache_clear()
+    _get_moonraker_env_python.cache_clear()
+    extract_device_signature.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# Helper: _SerialDirWatcher
+# ---------------------------------------------------------------------------
+
+# inotify event bits (linux/inotify.h); stdlib has no binding.
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_SERIAL_DIR_EVENTS = (
+    _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF
+)
+
+
+def _inotify_open(path: str) -> Optional[int]:
+    """Return a non-blocking inotify fd watching *path*, or None.
+
+    None means inotify is unavailable (non-Linux, no libc symbol) or the
+    directory cannot be watched (e.g. it does not exist yet).
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        init1 = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    fd = init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_watch(fd, os.fsencode(path), _SERIAL_DIR_EVENTS) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class _SerialDirWatcher:
+    """Sleep between re-enumeration polls, waking early on directory changes.
+
+    Where ``select.epoll`` exists (Linux) an inotify watch on the serial
+    directory lets :meth:`wait` return as soon as an entry is created or
+    removed instead of sleeping out the full poll interval. Every wait is
+    still bounded by the caller's timeout, so a lost watch (udev removes
+    ``/dev/serial/by-id`` when the last device goes away) degrades to plain
+    interval polling.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._fd: Optional[int] = None
+        self._epoll: Any = None
+        if hasattr(select, "epoll"):
+            self._fd = _inotify_open(path)
+        if self._fd is not None:
+            self._epoll = select.epoll()
+            self._epoll.register(self._fd, select.EPOLLIN)
+
+    def wait(self, timeout: float) -> None:
+        """Block for up to *timeout* seconds or until the directory changes."""
+        if timeout <= 0:
+            return
+        if self._epoll is None:
+            time.sleep(timeout)
+            return
+        if self._epoll.poll(timeout):
+            self._drain()
+
+    def _drain(self) -> None:
+        assert self._fd is not None
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.close()
+
+    def close(self) -> None:
+        if self._epoll is not None:
+            self._epoll.close()
+            self._epoll = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
 # ---------------------------------------------------------------------------
 # Helper: _poll_for_reenumeration
 # ---------------------------------------------------------------------------
@@ -228,6 +335,7 @@ def _poll_for_reenumeration(
     timeout: float = TIMEOUT_REENUMERATION,
     interval: float = POLL_INTERVAL,
     scan_fn: Any = None,
+    should_abort: Optional[Callable[[], bool]] = None,
 ) -> str | None:
     """Two-phase polling for USB device re-enumeration after bootloader entry.
 
@@ -246,46 +354,92 @@ def _poll_for_reenumeration(
         timeout: Maximum seconds to wait across both phases.
         interval: Seconds between polls (use 0.0 in tests).
         scan_fn: Optional callable returning ``list[str]`` of filenames in
-            the serial directory.  Defaults to ``os.listdir(SERIAL_DIR)``.
+            the serial directory.  Defaults to a scan of ``SERIAL_DIR``,
+            in which case waits between polls also wake early on inotify
+            events for ``SERIAL_DIR`` (see :class:`_SerialDirWatcher`).
+        should_abort: Optional callable checked on every tick; returning
+            True ends polling early (e.g. the bootloader helper failed).
 
     Returns:
         Full device path (``SERIAL_DIR + "/" + filename``) of the re-enumerated
         device, or None on timeout.
     """
+    original_filename = os.path.basename(original_path)
+    original_sig = extract_device_signature(original_filename)
+
+    deadline = time.monotonic() + timeout
+
+    watcher: Optional[_SerialDirWatcher] = None
     if scan_fn is None:
 
         def scan_fn() -> list[str]:
-            """Default scanner: list /dev/serial/by-id/ contents."""
+            """Default scanner: USB entries of /dev/serial/by-id/.
+
+            Only ``usb-*`` names can carry a signature; ``platform-*`` and
+            other entries are dropped while iterating (the original name is
+            always kept so Phase 1 still sees it).
+            """
             try:
-                return os.listdir(SERIAL_DIR)
+                with os.scandir(SERIAL_DIR) as it:
+                    return [
+                        e.name
+                        for e in it
+                        if e.name.startswith("usb-") or e.name == original_filename
+                    ]
             except (FileNotFoundError, OSError):
                 return []
 
-    original_filename = os.path.basename(original_path)
-    original_sig = extract_device_signature(original_filename)
-
-    deadline = time.monotonic() + timeout
-
-    # Phase 1: Wait for original device to disappear
-    while time.monotonic() < deadline:
-        filenames = scan_fn()
-        if original_filename not in filenames:
-            break  # Device has disappeared
         if interval > 0:
-            time.sleep(interval)
-    else:
-        # Timeout: device never disappeared
-        return None
+            watcher = _SerialDirWatcher(SERIAL_DIR)
+
+    # Polls run on a fixed cadence anchored at the start time, so scan work
+    # does not stretch the effective interval; an overrun skips ahead to the
+    # next tick instead of bursting to catch up.
+    next_tick = time.monotonic() + interval
+
+    def _wait() -> None:
+        nonlocal next_tick
+        now = time.monotonic()
+        if next_tick <= now:
+            next_tick += interval * ((now - next_tick) // interval + 1)
+        remaining = min(next_tick, deadline) - now
+        if watcher is not None:
+            watcher.wait(remaining)
+        elif remaining > 0:
+            time.sleep(remaining)
 
-    # Phase 2: Scan for matching device reappearance
-    while time.monotonic() < deadline:
-        filenames = scan_fn()
-        for fname in filenames:
-            sig = extract_device_signature(fname)
-            if sig is not None and original_sig is not None and sig == original_sig:
-                return os.path.join(SERIAL_DIR, fname)
-        if interval > 0:
-            time.sleep(interval)
+    try:
+        # Phase 1: Wait for original device to disappear
+        while time.monotonic() < deadline:
+            if original_filename not in scan_fn():
+                break  # Device has disappeared
+            if should_abort is not None and should_abort():
+                return None
+            if interval > 0:
+                _wait()
+        else:
+            # Timeout: device never disappeared
+            return None
+
+        # Phase 2: Scan for matching device reappearance. Only names containing
+        # the original serial hex can carry a matching signature, so the regex
+        # runs on candidates only.
+        needle = original_sig[1] if original_sig is not None else None
+        while time.monotonic() < deadline:
+            filenames = scan_fn()
+            if needle is not None:
+                for fname in filenames:
+                    if needle not in fname:
+                        continue
+                    if extract_device_signature(fname) == original_sig:
+                        return os.path.join(SERIAL_DIR, fname)
+            if should_abort is not None and should_abort():
+                return None
+            if interval > 0:
+                _wait()
+    finally:
+        if watcher is not None:
+            watcher.close()
 
     # Timeout: device never reappeared
     return None
@@ -333,6 +487,102 @@ def _enter_none(
     )
 
 
+# ---------------------------------------------------------------------------
+# Helper: in-process flash_usb
+# ---------------------------------------------------------------------------
+
+
+def _is_current_interpreter(python_path: str) -> bool:
+    """True when *python_path* belongs to the environment running kflash.
+
+    Compares the interpreter's environment root (``<root>/bin/python3``)
+    with ``sys.prefix`` without following symlinks: a venv's ``bin/python3``
+    links back to its base interpreter, so klippy-env and kflash's own venv
+    would otherwise look identical while importing from different
+    site-packages.
+    """
+    found = shutil.which(python_path)
+    if found is None:
+        return False
+    root = os.path.dirname(os.path.dirname(os.path.abspath(found)))
+    return os.path.normcase(root) == os.path.normcase(os.path.abspath(sys.prefix))
+
+
+def _load_flash_usb(scripts_dir: str) -> Optional[Callable[[str], None]]:
+    """Load ``enter_bootloader`` from Klipper's ``scripts/flash_usb.py``.
+
+    The script is loaded by file path so ``sys.path`` is left untouched.
+
+    Returns:
+        The ``enter_bootloader`` callable, or None if the script is missing
+        or fails to import (the caller then falls back to a subprocess).
+    """
+    script = os.path.join(scripts_dir, "flash_usb.py")
+    if not os.path.isfile(script):
+        return None
+    spec = importlib.util.spec_from_file_location("flash_usb", script)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    return getattr(module, "enter_bootloader", None)
+
+
+def _call_with_timeout(func: Callable[[str], None], arg: str, timeout: float) -> bool:
+    """Run ``func(arg)`` on a daemon thread; False if it outlives *timeout*.
+
+    Exceptions are swallowed to match the subprocess path, whose exit status
+    is ignored -- re-enumeration polling is the real success check. The
+    helper's one "Entering bootloader on ..." line goes to stderr as-is:
+    ``sys.stderr`` is process-global, so it is not redirected from a worker
+    thread.
+    """
+
+    def _target() -> None:
+        try:
+            func(arg)
+        except (Exception, SystemExit):
+            pass
+
+    thread = threading.Thread(target=_target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+class _BackgroundHelper:
+    """Run a bootloader-entry helper on a daemon thread.
+
+    The device usually drops off the bus while the helper is still running,
+    so re-enumeration polling starts right away instead of waiting for the
+    helper to exit.  *func* returns None on success or an error message.
+    """
+
+    def __init__(self, func: Callable[[], Optional[str]]) -> None:
+        self._error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, args=(func,), daemon=True)
+        self._thread.start()
+
+    def _run(self, func: Callable[[], Optional[str]]) -> None:
+        self._error = func()
+
+    def failed(self) -> bool:
+        """True once the helper has exited with an error (polling can stop)."""
+        return not self._thread.is_alive() and self._error is not None
+
+    def finish(self) -> Optional[str]:
+        """Reap the helper and return its error message, if any.
+
+        The helper bounds itself with TIMEOUT_BOOTLOADER_CMD, so this join
+        only waits out whatever is left of that budget.
+        """
+        self._thread.join(TIMEOUT_BOOTLOADER_CMD)
+        return self._error
+
+
 # ---------------------------------------------------------------------------
 # Method: _enter_usb
 # ---------------------------------------------------------------------------
@@ -350,8 +600,10 @@ def _enter_usb(
     """Enter bootloader via Klipper's flash_usb.enter_bootloader().
 
     Calls the Klipper flash_usb script through the klippy-env Python
-    interpreter to trigger a USB bootloader entry.  After the command,
-    polls for device re-enumeration.
+    interpreter to trigger a USB bootloader entry.  When that interpreter is
+    the one already running kflash, the script is imported and called
+    in-process instead, skipping an interpreter cold start.  Re-enumeration
+    polling runs alongside the helper rather than after it.
 
     Args:
         device_path: Current device serial path.
@@ -369,35 +621,44 @@ def _enter_usb(
     # Build the script that imports and calls flash_usb.enter_bootloader
     klipper_path = Path(klipper_dir).expanduser().resolve()
     scripts_dir = str(klipper_path / "scripts")
-    script = (
-        f"import sys; sys.path.insert(0, {scripts_dir!r}); "
-        f"from flash_usb import enter_bootloader; "
-        f"enter_bootloader({device_path!r})"
-    )
 
-    try:
-        usb_result = runner.run(
-            [python_path, "-c", script],
-            timeout=TIMEOUT_BOOTLOADER_CMD,
-        )
-    except OSError as exc:
-        return BootloaderResult(
-            success=False,
-            error_message=f"Failed to run USB bootloader entry: {exc}",
-        )
-    if usb_result.timed_out:
-        return BootloaderResult(
-            success=False,
-            error_message=f"USB bootloader entry timed out ({TIMEOUT_BOOTLOADER_CMD}s)",
+    in_process = None
+    if _is_current_interpreter(python_path):
+        in_process = _load_flash_usb(scripts_dir)
+    timeout_message = f"USB bootloader entry timed out ({TIMEOUT_BOOTLOADER_CMD}s)"
+
+    def _run_helper() -> Optional[str]:
+        if in_process is not None:
+            if not _call_with_timeout(in_process, device_path, TIMEOUT_BOOTLOADER_CMD):
+                return timeout_message
+            return None
+        script = (
+            f"import sys; sys.path.insert(0, {scripts_dir!r}); "
+            f"from flash_usb import enter_bootloader; "
+            f"enter_bootloader({device_path!r})"
         )
+        try:
+            usb_result = runner.run(
+                [python_path, "-c", script],
+                timeout=TIMEOUT_BOOTLOADER_CMD,
+                capture=False,  # output unused; re-enumeration is the check
+            )
+        except OSError as exc:
+            return f"Failed to run USB bootloader entry: {exc}"
+        return timeout_message if usb_result.timed_out else None
 
-    # Poll for device re-enumeration
+    # Poll for device re-enumeration while the helper runs
+    helper = _BackgroundHelper(_run_helper)
     new_path = _poll_for_reenumeration(
         original_path=device_path,
         serial_pattern=device_entry.serial_pattern,
-        timeout=TIMEOUT_REENUMERATION,
+        timeout=TIMEOUT_BOOTLOADER_CMD + TIMEOUT_REENUMERATION,
         interval=POLL_INTERVAL,
+        should_abort=helper.failed,
     )
+    error = helper.finish()
+    if error is not None:
+        return BootloaderResult(success=False, error_message=error)
 
     if new_path is None:
         return BootloaderResult(
@@ -432,7 +693,8 @@ def _enter_serial(
     """Enter bootloader via Katapult flashtool.py -r (serial reset).
 
     Uses the Moonraker venv Python (which has pyserial installed) to run
-    flashtool.py with the reset flag.
+    flashtool.py with the reset flag, polling for re-enumeration while it
+    runs.
 
     Args:
         device_path: Current device serial path.
@@ -458,29 +720,31 @@ def _enter_serial(
     # Use Moonraker venv for pyserial access
     python_path = _get_moonraker_env_python(klipper_dir)
 
-    try:
-        serial_result = runner.run(
-            [python_path, str(flashtool), "-r", "-d", device_path],
-            timeout=TIMEOUT_BOOTLOADER_CMD,
-        )
-    except OSError as exc:
-        return BootloaderResult(
-            success=False,
-            error_message=f"Failed to run flashtool.py: {exc}",
-        )
-    if serial_result.timed_out:
-        return BootloaderResult(
-            success=False,
-            error_message=f"Serial bootloader entry timed out ({TIMEOUT_BOOTLOADER_CMD}s)",
-        )
+    def _run_helper() -> Optional[str]:
+        try:
+            serial_result = runner.run(
+                [python_path, str(flashtool), "-r", "-d", device_path],
+                timeout=TIMEOUT_BOOTLOADER_CMD,
+                capture=False,  # output unused; re-enumeration is the check
+            )
+        except OSError as exc:
+            return f"Failed to run flashtool.py: {exc}"
+        if serial_result.timed_out:
+            return f"Serial bootloader entry timed out ({TIMEOUT_BOOTLOADER_CMD}s)"
+        return None
 
-    # Poll for device re-enumeration
+    # Poll for device re-enumeration while flashtool runs
+    helper = _BackgroundHelper(_run_helper)
     new_path = _poll_for_reenumeration(
         original_path=device_path,
         serial_pattern=device_entry.serial_pattern,
-        timeout=TIMEOUT_REENUMERATION,
+        timeout=TIMEOUT_BOOTLOADER_CMD + TIMEOUT_REENUMERATION,
         interval=POLL_INTERVAL,
+        should_abort=helper.failed,
     )
+    error = helper.finish()
+    if error is not None:
+        return BootloaderResult(success=False, error_message=error)
 
     if new_path is None:
         return BootloaderResult(
@@ -652,3 +916,16 @@ def _enter_can(
         success=True,
         device_path=None,  # CAN devices have no USB serial path
     )
+
+
+# ---------------------------------------------------------------------------
+# Method dispatch table
+# ---------------------------------------------------------------------------
+
+_DISPATCH: dict[str, Callable[..., BootloaderResult]] = {
+    "usb": _enter_usb,
+    "serial": _enter_serial,
+    "manual": _enter_manual,
+    "none": _enter_none,
+    "can": _enter_can,
+}
@@ -5,16 +5,30 @@ from __future__ import annotations
 import multiprocessing
 import os
 import time
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from . import runner
-from .ccache import configure_ccache, get_build_env, get_ccache_stats
+from .ccache import (
+    configure_ccache,
+    get_build_env,
+    get_ccache_stats,
+    read_statslog_since,
+    statslog_offset,
+)
+from .config import safe_mtime
 from .models import BuildResult, CcacheStats
 
 # Default timeout for build operations (5 minutes)
 TIMEOUT_BUILD = 300
 
+# Lines of make output kept for BuildResult.error_output on failure
+BUILD_TAIL_LINES = 200
+
+# Firmware images in out/, in order of preference (.uf2 is RP2040's format)
+FIRMWARE_NAMES = ("klipper.bin", "klipper.uf2")
+
 
 def run_menuconfig(klipper_dir: str, config_path: str) -> tuple[int, bool]:
     """Run make menuconfig with inherited stdio for ncurses TUI.
@@ -35,13 +49,10 @@ def run_menuconfig(klipper_dir: str, config_path: str) -> tuple[int, bool]:
     config_abs = Path(config_path).expanduser().absolute()
 
     # Record mtime before (None if file doesn't exist yet)
-    mtime_before: Optional[float] = None
-    if config_abs.exists():
-        mtime_before = config_abs.stat().st_mtime
+    mtime_before = safe_mtime(config_abs)
 
     # Set up environment with KCONFIG_CONFIG pointing to absolute path
-    env = os.environ.copy()
-    env["KCONFIG_CONFIG"] = str(config_abs)
+    env = {**os.environ, "KCONFIG_CONFIG": str(config_abs)}
 
     # Run menuconfig with inherited stdio (no PIPE) for ncurses TUI
     # User can navigate, edit, save with normal keyboard controls
@@ -52,39 +63,104 @@ def run_menuconfig(klipper_dir: str, config_path: str) -> tuple[int, bool]:
     )
 
     # Check if config was saved (mtime changed or file created)
-    was_saved = False
-    if config_abs.exists():
-        mtime_after = config_abs.stat().st_mtime
-        if mtime_before is None or mtime_after > mtime_before:
-            was_saved = True
+    mtime_after = safe_mtime(config_abs)
+    was_saved = mtime_after is not None and (mtime_before is None or mtime_after > mtime_before)
 
     return returncode, was_saved
 
 
 def _captured_tail(result: runner.CommandResult) -> Optional[str]:
-    """Return the last 200 lines of the captured build output."""
-    raw = (result.stdout or "") + (result.stderr or "")
-    lines = raw.splitlines()
-    return "\n".join(lines[-200:])
+    """Return the last BUILD_TAIL_LINES lines of the captured build output.
+
+    stdout and stderr are fed into one bounded deque in turn rather than
+    concatenated first, so no combined copy of the output is built.
+    """
+    tail: deque[str] = deque(maxlen=BUILD_TAIL_LINES)
+    for chunk in (result.stdout, result.stderr):
+        if chunk:
+            tail.extend(chunk.splitlines())
+    return "\n".join(tail)
+
+
+def _step_failure(
+    result: runner.CommandResult,
+    start_time: float,
+    step: str,
+    timeout_message: str,
+) -> Optional[BuildResult]:
+    """Return a failed BuildResult if a make step timed out or failed, else None."""
+    if result.timed_out:
+        message = timeout_message
+    elif result.returncode != 0:
+        message = f"{step} failed with exit code {result.returncode}"
+    else:
+        return None
+    return BuildResult(
+        success=False,
+        elapsed_seconds=time.monotonic() - start_time,
+        error_message=message,
+        error_output=_captured_tail(result),
+    )
+
+
+def _run_make(
+    argv: list[str],
+    klipper_path: Path,
+    timeout: int,
+    env: Optional[dict[str, str]],
+) -> runner.CommandResult:
+    """Run a make step, keeping only the tail of its merged output.
+
+    Output is read line-by-line from a pipe into a bounded buffer, so a full
+    build's megabytes of compiler output are never held in memory at once;
+    the result's ``stdout`` holds the last BUILD_TAIL_LINES lines.
+    """
+    return runner.run_streaming_lines(
+        argv,
+        cwd=str(klipper_path),
+        timeout=timeout,
+        env=env,  # None uses default environment
+        on_line=lambda line: None,
+        max_lines=BUILD_TAIL_LINES,
+    )
 
 
 def run_build(
     klipper_dir: str,
     timeout: int = TIMEOUT_BUILD,
     use_ccache: bool = False,
+    clean: Literal["auto", "always", "never"] = "auto",
+    jobs: Optional[int] = None,
 ) -> BuildResult:
-    """Run make clean + make -j with captured output.
+    """Run make clean (per *clean*) + make -j with captured output.
 
     Executes build in klipper directory, capturing stdout/stderr instead of
     inheriting the terminal (a build's high-volume output would otherwise
     overdraw the TUI). Uses all available CPU cores for parallel compilation.
-    On failure, the last 200 captured lines are returned in
-    ``BuildResult.error_output``.
+    Only a bounded tail of the output is retained; on failure, the last
+    BUILD_TAIL_LINES lines are returned in ``BuildResult.error_output``.
 
     Args:
         klipper_dir: Path to klipper source directory (supports ~)
         timeout: Seconds before timeout (default: TIMEOUT_BUILD)
         use_ccache: Enable ccache build acceleration if available
+        clean: When to run ``make clean`` first. ``"always"`` cleans;
+            ``"never"`` builds incrementally on top of the existing
+            ``out/`` tree (Klipper's Makefile still rebuilds everything
+            that depends on a changed ``.config``). ``"auto"`` (default)
+            cleans unless ccache is in use: recompiling unchanged objects
+            is then a cache lookup, and a changed ``.config`` still
+            regenerates ``autoconf.h``, which every object depends on.
+            The clean stays a separate invocation: with ``-j``,
+            ``make clean all`` may run both goals concurrently. Whenever
+            the clean is skipped, ``out/klipper.bin`` and
+            ``out/klipper.uf2`` are deleted first so a board switch cannot
+            report the previous build's image as the new firmware.
+        jobs: Parallel make jobs (default: CPU count). The same value caps
+            the load average (``-l``) so serial link steps are not
+            over-scheduled on small or hybrid-core hosts, and
+            ``--output-sync`` keeps each target's output contiguous in the
+            captured tail.
 
     Returns:
         BuildResult with success status, firmware path/size, elapsed time
@@ -95,68 +171,52 @@ def run_build(
     # Get ccache environment if enabled
     build_env = get_build_env(use_ccache)
     pre_stats: Optional[CcacheStats] = None
+    pre_offset: Optional[int] = None
     if build_env is not None:
         # Configure ccache on first use (idempotent)
         configure_ccache()
-        pre_stats = get_ccache_stats()
-
-    # Run make clean with captured output
-    clean_result = runner.run(
-        ["make", "clean"],
-        cwd=str(klipper_path),
-        timeout=timeout,
-        env=build_env,  # None uses default environment
-    )
-
-    if clean_result.timed_out:
-        return BuildResult(
-            success=False,
-            elapsed_seconds=time.monotonic() - start_time,
-            error_message=f"make clean timed out after {timeout}s",
-            error_output=_captured_tail(clean_result),
+        # ccache 4.x logs each result to CCACHE_STATSLOG; older releases
+        # need a --print-stats snapshot on either side of the build.
+        pre_offset = statslog_offset()
+        if pre_offset is None:
+            pre_stats = get_ccache_stats()
+
+    if clean == "always" or (clean == "auto" and build_env is None):
+        # Run make clean with captured output
+        clean_result = _run_make(["make", "clean"], klipper_path, timeout, build_env)
+
+        failure = _step_failure(
+            clean_result, start_time, "make clean", f"make clean timed out after {timeout}s"
         )
-
-    if clean_result.returncode != 0:
-        elapsed = time.monotonic() - start_time
-        return BuildResult(
-            success=False,
-            elapsed_seconds=elapsed,
-            error_message=f"make clean failed with exit code {clean_result.returncode}",
-            error_output=_captured_tail(clean_result),
-        )
-
-    # Run make -j with all available cores, captured output
-    nproc = multiprocessing.cpu_count()
-    build_result = runner.run(
-        ["make", f"-j{nproc}"],
-        cwd=str(klipper_path),
-        timeout=timeout,
-        env=build_env,  # None uses default environment
+        if failure is not None:
+            return failure
+    else:
+        # out/ survives between builds: drop the previous firmware image so a
+        # board switch (e.g. .bin -> .uf2) cannot pick up a stale one below.
+        for name in FIRMWARE_NAMES:
+            (klipper_path / "out" / name).unlink(missing_ok=True)
+
+    # Run make -j with all available cores (or `jobs`), captured output
+    nproc = jobs or multiprocessing.cpu_count()
+    build_result = _run_make(
+        ["make", f"-j{nproc}", f"-l{nproc}", "--output-sync=recurse"],
+        klipper_path,
+        timeout,
+        build_env,
     )
 
-    if build_result.timed_out:
-        return BuildResult(
-            success=False,
-            elapsed_seconds=time.monotonic() - start_time,
-            error_message=f"Build timed out after {timeout}s",
-            error_output=_captured_tail(build_result),
-        )
+    failure = _step_failure(build_result, start_time, "make", f"Build timed out after {timeout}s")
+    if failure is not None:
+        return failure
 
     elapsed = time.monotonic() - start_time
 
-    if build_result.returncode != 0:
-        return BuildResult(
-            success=False,
-            elapsed_seconds=elapsed,
-            error_message=f"make failed with exit code {build_result.returncode}",
-            error_output=_captured_tail(build_result),
-        )
-
     # Check for firmware output (.bin preferred, .uf2 for RP2040)
-    firmware_path = klipper_path / "out" / "klipper.bin"
-    if not firmware_path.exists():
-        firmware_path = klipper_path / "out" / "klipper.uf2"
-    if not firmware_path.exists():
+    for name in FIRMWARE_NAMES:
+        firmware_path = klipper_path / "out" / name
+        if firmware_path.exists():
+            break
+    else:
         return BuildResult(
             success=False,
             elapsed_seconds=elapsed,
@@ -168,11 +228,14 @@ def run_build(
     # Get ccache stats if ccache was used (per-build delta when possible)
     ccache_stats = None
     if use_ccache and build_env is not None:
-        post_stats = get_ccache_stats()
-        if pre_stats and post_stats:
-            ccache_stats = _delta_ccache_stats(pre_stats, post_stats)
+        if pre_offset is not None:
+            ccache_stats = read_statslog_since(pre_offset)
         else:
-            ccache_stats = post_stats
+            post_stats = get_ccache_stats()
+            if pre_stats and post_stats:
+                ccache_stats = _delta_ccache_stats(pre_stats, post_stats)
+            else:
+                ccache_stats = post_stats
 
     return BuildResult(
         success=True,
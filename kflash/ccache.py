@@ -6,7 +6,9 @@ configuration, and statistics retrieval.
 
 from __future__ import annotations
 
+import functools
 import os
+import re
 import shutil
 from pathlib import Path
 from typing import Optional
@@ -14,6 +16,55 @@ from typing import Optional
 from kflash import runner
 from kflash.models import CcacheStats
 
+_NUMBER_RE = re.compile(r"\d+")
+_SIZE_RE = re.compile(r"([\d.]+)\s*([KMGT]i?B?)?", re.IGNORECASE)
+_VERSION_RE = re.compile(r"ccache version (\d+)\.(\d+)(?:\.(\d+))?")
+
+# Size at which the build stats log is truncated before the next build
+STATSLOG_MAX_BYTES = 1024 * 1024
+
+_SIZE_MULTIPLIERS = {
+    "": 1,
+    "B": 1,
+    "K": 1024,
+    "KB": 1024,
+    "KIB": 1024,
+    "M": 1024**2,
+    "MB": 1024**2,
+    "MIB": 1024**2,
+    "G": 1024**3,
+    "GB": 1024**3,
+    "GIB": 1024**3,
+    "T": 1024**4,
+    "TB": 1024**4,
+    "TIB": 1024**4,
+}
+
+# Human-readable --show-stats labels -> (CcacheStats field, is a size).
+# Checked in order, so "max cache size" must precede its "cache size" suffix.
+_SHOW_STATS_LABELS: tuple[tuple[tuple[str, ...], str, bool], ...] = (
+    (("cache hit (direct)", "direct cache hit"), "cache_hit_direct", False),
+    (
+        ("cache hit (preprocessed)", "preprocessed cache hit"),
+        "cache_hit_preprocessed",
+        False,
+    ),
+    (("cache miss",), "cache_miss", False),
+    (("max cache size", "maximum cache size"), "cache_max_bytes", True),
+    (("cache size",), "cache_size_bytes", True),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _which_ccache() -> Optional[str]:
+    """Resolve the ccache executable on PATH once per process.
+
+    A build asks several times (env setup, configuration, symlinks, stats);
+    each ``shutil.which`` walks and stats every PATH entry. Cleared by
+    :func:`reset_caches` after installing ccache.
+    """
+    return shutil.which("ccache")
+
 
 def is_ccache_available() -> bool:
     """Check if ccache is installed and available in PATH.
@@ -21,7 +72,7 @@ def is_ccache_available() -> bool:
     Returns:
         True if ccache executable found, False otherwise.
     """
-    return shutil.which("ccache") is not None
+    return _which_ccache() is not None
 
 
 def get_ccache_bin_dir() -> Path:
@@ -33,7 +84,12 @@ def get_ccache_bin_dir() -> Path:
     Returns:
         Path to the ccache symlink directory.
     """
-    xdg_data_home = os.environ.get("XDG_DATA_HOME", "")
+    return _ccache_bin_dir(os.environ.get("XDG_DATA_HOME", ""), os.environ.get("HOME", ""))
+
+
+@functools.lru_cache(maxsize=8)
+def _ccache_bin_dir(xdg_data_home: str, home: str) -> Path:
+    """Memoized body of get_ccache_bin_dir, keyed on the variables it reads."""
     if xdg_data_home and os.path.isabs(xdg_data_home):
         base = Path(xdg_data_home)
     else:
@@ -51,7 +107,7 @@ def setup_ccache_symlinks() -> bool:
     Returns:
         True if symlinks created/verified successfully, False if ccache unavailable.
     """
-    ccache_path = shutil.which("ccache")
+    ccache_path = _which_ccache()
     if ccache_path is None:
         return False
 
@@ -62,43 +118,64 @@ def setup_ccache_symlinks() -> bool:
         return False
 
     compilers = ["arm-none-eabi-gcc", "arm-none-eabi-g++"]
+    try:
+        # One directory read instead of an lstat/stat per compiler
+        with os.scandir(bin_dir) as it:
+            existing = {entry.name: entry for entry in it}
+    except OSError:
+        return False
+
     for compiler in compilers:
-        symlink_path = bin_dir / compiler
+        entry = existing.get(compiler)
         try:
-            if symlink_path.is_symlink():
-                # Check if symlink points to correct target
-                if os.readlink(symlink_path) == ccache_path:
-                    continue  # Already correct, skip
-                # Wrong target, remove and recreate
-                symlink_path.unlink()
-            elif symlink_path.exists():
-                # Regular file exists, remove it
-                symlink_path.unlink()
+            if entry is not None:
+                # Already correct symlink: skip; anything else is replaced
+                if entry.is_symlink() and os.readlink(entry.path) == ccache_path:
+                    continue
+                os.unlink(entry.path)
 
             # Create symlink pointing to ccache
-            symlink_path.symlink_to(ccache_path)
+            os.symlink(ccache_path, bin_dir / compiler)
         except OSError:
             return False
 
     return True
 
 
+def get_ccache_statslog_path() -> Path:
+    """Get the path of the ccache stats log written during kflash builds.
+
+    Lives next to the ccache symlink directory. ccache appends one
+    ``# <source>`` header plus one statistic id per line for every
+    compilation when CCACHE_STATSLOG is set.
+
+    Returns:
+        Path to the stats log file.
+    """
+    return get_ccache_bin_dir().parent / "stats.log"
+
+
 def get_ccache_env() -> dict[str, str]:
     """Get environment with ccache bin directory prepended to PATH.
 
+    Also points CCACHE_STATSLOG at :func:`get_ccache_statslog_path` so
+    per-build statistics can be read back without running ccache, and sets
+    CCACHE_NOHASHDIR so Klipper checkouts at different paths share hits
+    without touching the user's global ccache.conf.
+
     Returns:
         Copy of current environment with modified PATH.
     """
-    env = os.environ.copy()
     bin_dir = str(get_ccache_bin_dir())
-    current_path = env.get("PATH", "")
-
-    if current_path:
-        env["PATH"] = f"{bin_dir}{os.pathsep}{current_path}"
-    else:
-        env["PATH"] = bin_dir
-
-    return env
+    current_path = os.environ.get("PATH", "")
+    path = f"{bin_dir}{os.pathsep}{current_path}" if current_path else bin_dir
+
+    return {
+        **os.environ,
+        "PATH": path,
+        "CCACHE_STATSLOG": str(get_ccache_statslog_path()),
+        "CCACHE_NOHASHDIR": "1",
+    }
 
 
 def get_ccache_config_commands() -> list[tuple[str, str]]:
@@ -111,6 +188,7 @@ def get_ccache_config_commands() -> list[tuple[str, str]]:
         ("sloppiness", "time_macros"),  # Ignore __DATE__ and __TIME__ macros
         ("max_size", "2G"),  # 2GB cache size
         ("compression", "true"),  # Enable compression
+        ("compiler_check", "content"),  # Survive toolchain reinstalls (mtime changes)
     ]
 
 
@@ -140,36 +218,75 @@ def get_build_env(use_ccache: bool) -> Optional[dict[str, str]]:
     return get_ccache_env()
 
 
+# Set once configure_ccache() has succeeded in this process; the settings are
+# persisted in ccache.conf, so later builds need not re-apply them.
+_ccache_configured = False
+
+
 def configure_ccache() -> bool:
     """Configure ccache with optimal settings for Klipper builds.
 
-    Runs ccache --set-config for each configuration option.
+    Applies every option in a single ``ccache`` invocation (one
+    ``--set-config`` flag per option) and skips the call entirely once it has
+    succeeded in this process.
 
     Returns:
-        True if all configuration commands succeeded, False otherwise.
+        True if the configuration command succeeded, False otherwise.
     """
+    global _ccache_configured
+    if _ccache_configured:
+        return True
+
     if not is_ccache_available():
         return False
 
+    argv = ["ccache"]
     for option, value in get_ccache_config_commands():
-        try:
-            result = runner.run(
-                ["ccache", "--set-config", f"{option}={value}"],
-                timeout=10,
-                text=False,
-            )
-            if result.returncode != 0:
-                return False
-        except OSError:
-            return False
+        argv += ["--set-config", f"{option}={value}"]
+    try:
+        result = runner.run(argv, timeout=10, text=False)
+    except OSError:
+        return False
+    if result.returncode != 0:
+        return False
 
+    _ccache_configured = True
     return True
 
 
+def reset_caches() -> None:
+    """Forget per-process ccache state (tests, or after installing ccache)."""
+    global _ccache_configured
+    _ccache_configured = False
+    _which_ccache.cache_clear()
+    _ccache_version.cache_clear()
+    _ccache_bin_dir.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _ccache_version() -> tuple[int, int, int]:
+    """Return the installed ccache version, probed once per process.
+
+    Returns:
+        (major, minor, patch), or (0, 0, 0) if the version cannot be determined.
+    """
+    try:
+        result = runner.run(["ccache", "--version"], timeout=10)
+    except OSError:
+        return (0, 0, 0)
+    if result.returncode != 0:
+        return (0, 0, 0)
+    match = _VERSION_RE.search(result.stdout)
+    if not match:
+        return (0, 0, 0)
+    return (int(match.group(1)), int(match.group(2)), int(match.group(3) or 0))
+
+
 def get_ccache_stats() -> Optional[CcacheStats]:
     """Get current ccache statistics.
 
-    Runs ccache --print-stats and parses the output.
+    Runs ccache --print-stats and parses the tab-separated output. ccache
+    releases older than 4.0 fall back to parsing --show-stats.
 
     Returns:
         CcacheStats object with current statistics, or None on failure.
@@ -182,13 +299,16 @@ def get_ccache_stats() -> Optional[CcacheStats]:
         if result.returncode != 0:
             return None
 
-        stats = _parse_ccache_stats(result.stdout)
-        if stats and stats.total_calls == 0 and result.stdout.strip():
-            # Fallback: some versions format stats differently
+        stats = _parse_print_stats(result.stdout)
+        if _ccache_version() >= (4, 0, 0):
+            return stats
+
+        if stats.total_calls == 0 and result.stdout.strip():
+            # Legacy ccache: --print-stats keys differ, use --show-stats instead
             show = runner.run(["ccache", "--show-stats"], timeout=10)
             if show.returncode == 0:
-                fallback = _parse_ccache_stats(show.stdout)
-                if fallback and fallback.total_calls > 0:
+                fallback = _parse_show_stats(show.stdout)
+                if fallback.total_calls > 0:
                     return fallback
 
         return stats
@@ -196,25 +316,72 @@ def get_ccache_stats() -> Optional[CcacheStats]:
         return None
 
 
-def _parse_ccache_stats(output: str) -> Optional[CcacheStats]:
-    """Parse ccache --print-stats output into CcacheStats.
+def statslog_offset() -> Optional[int]:
+    """Return the current size of the ccache stats log, to mark a build start.
+
+    The log is truncated here once it exceeds STATSLOG_MAX_BYTES, which
+    keeps it bounded without a separate cleanup step.
 
-    Handles both old and new ccache output formats.
+    Returns:
+        Byte offset (0 if the log does not exist yet), or None if the
+        installed ccache predates stats log support (< 4.0).
+    """
+    if _ccache_version() < (4, 0, 0):
+        return None
+    path = get_ccache_statslog_path()
+    try:
+        size = os.path.getsize(path)
+        if size > STATSLOG_MAX_BYTES:
+            # Only the entries appended after this point are ever read back
+            os.truncate(path, 0)
+            return 0
+        return size
+    except OSError:
+        return 0
+
+
+def read_statslog_since(offset: int) -> Optional[CcacheStats]:
+    """Count the ccache results appended to the stats log after *offset*.
 
     Args:
-        output: Raw output from ccache --print-stats.
+        offset: Value previously returned by :func:`statslog_offset`.
 
     Returns:
-        CcacheStats object or None if parsing fails.
+        CcacheStats with hit/miss counts for the appended entries (cache
+        size fields are left at 0), or None if the log cannot be read.
     """
     stats = CcacheStats()
+    try:
+        with open(get_ccache_statslog_path(), "rb") as f:
+            f.seek(offset)
+            delta = f.read()
+    except FileNotFoundError:
+        return stats  # Nothing was compiled through ccache
+    except OSError:
+        return None
+
+    for line in delta.splitlines():
+        if line == b"direct_cache_hit":
+            stats.cache_hit_direct += 1
+        elif line == b"preprocessed_cache_hit":
+            stats.cache_hit_preprocessed += 1
+        elif line == b"cache_miss":
+            stats.cache_miss += 1
+    return stats
+
+
+class _StatsBuilder:
+    """Accumulates ccache key/value pairs into a CcacheStats."""
 
-    total_miss_value: Optional[int] = None
-    direct_miss_value = 0
-    preprocessed_miss_value = 0
+    def __init__(self) -> None:
+        self.stats = CcacheStats()
+        self.total_miss: Optional[int] = None
+        self.direct_miss = 0
+        self.preprocessed_miss = 0
 
-    def _apply_kv(key: str, value: str) -> bool:
-        nonlocal total_miss_value, direct_miss_value, preprocessed_miss_value
+    def apply(self, key: str, value: str) -> bool:
+        """Apply one key/value pair; return True if the key was recognised."""
+        stats = self.stats
         key = key.strip().replace("-", "_")
         if not key:
             return False
@@ -226,14 +393,14 @@ def _parse_ccache_stats(output: str) -> Optional[CcacheStats]:
                 stats.cache_hit_preprocessed = int(value)
                 return True
             if key == "cache_miss":
-                total_miss_value = int(value)
-                stats.cache_miss = total_miss_value
+                self.total_miss = int(value)
+                stats.cache_miss = self.total_miss
                 return True
             if key == "direct_cache_miss":
-                direct_miss_value = int(value)
+                self.direct_miss = int(value)
                 return True
             if key == "preprocessed_cache_miss":
-                preprocessed_miss_value = int(value)
+                self.preprocessed_miss = int(value)
                 return True
             if key in {"cache_size_kibibyte", "cache_size_kib", "cache_size_kibibytes"}:
                 stats.cache_size_bytes = int(value) * 1024
@@ -255,51 +422,69 @@ def _parse_ccache_stats(output: str) -> Optional[CcacheStats]:
             return False
         return False
 
+    def finish(self) -> CcacheStats:
+        if self.total_miss is None and (self.direct_miss or self.preprocessed_miss):
+            self.stats.cache_miss = self.direct_miss + self.preprocessed_miss
+        return self.stats
+
+
+def _parse_print_stats(output: str) -> CcacheStats:
+    """Parse machine-readable ccache --print-stats output.
+
+    Only tab-separated key/value lines are considered; anything else is
+    ignored.
+
+    Args:
+        output: Raw output from ccache --print-stats.
+
+    Returns:
+        CcacheStats object (all zero if nothing was recognised).
+    """
+    builder = _StatsBuilder()
+    for line in output.splitlines():
+        key, sep, value = line.partition("\t")
+        if sep:
+            builder.apply(key, value.strip())
+    return builder.finish()
+
+
+def _parse_show_stats(output: str) -> CcacheStats:
+    """Parse legacy ccache output (pre-4.0 --print-stats or --show-stats).
+
+    Handles space/colon-separated key/value lines and the human-readable
+    --show-stats layout.
+
+    Args:
+        output: Raw output from ccache.
+
+    Returns:
+        CcacheStats object (all zero if nothing was recognised).
+    """
+    builder = _StatsBuilder()
     for line in output.splitlines():
         line = line.strip()
         if not line:
             continue
 
-        # Prefer machine-readable --print-stats output (tab-separated key/value)
-        if "\t" in line:
-            key, value = line.split("\t", 1)
-            if _apply_kv(key, value):
-                continue
-
         # Space/colon-separated key/value (varies by ccache version)
         tokens = line.replace(":", " ").split()
-        if len(tokens) >= 2 and _apply_kv(tokens[0], tokens[1]):
+        if len(tokens) >= 2 and builder.apply(tokens[0], tokens[1]):
             continue
 
         # Fallback: human-readable output parsing
         lower = line.lower()
-        # Parse direct cache hits
-        if "cache hit (direct)" in lower or "direct cache hit" in lower:
-            stats.cache_hit_direct = _extract_number(line)
-        # Parse preprocessed cache hits
-        elif "cache hit (preprocessed)" in lower or "preprocessed cache hit" in lower:
-            stats.cache_hit_preprocessed = _extract_number(line)
-        # Parse cache misses
-        elif "cache miss" in lower:
-            stats.cache_miss = _extract_number(line)
-        # Parse cache size (bytes)
-        elif "cache size" in lower:
-            stats.cache_size_bytes = _extract_size_bytes(line)
-        # Parse max cache size
-        elif "max cache size" in lower or "maximum cache size" in lower:
-            stats.cache_max_bytes = _extract_size_bytes(line)
-
-    if total_miss_value is None and (direct_miss_value or preprocessed_miss_value):
-        stats.cache_miss = direct_miss_value + preprocessed_miss_value
+        for labels, field, is_size in _SHOW_STATS_LABELS:
+            if any(label in lower for label in labels):
+                value = _extract_size_bytes(line) if is_size else _extract_number(line)
+                setattr(builder.stats, field, value)
+                break
 
-    return stats
+    return builder.finish()
 
 
 def _extract_number(line: str) -> int:
     """Extract first integer from a line."""
-    import re
-
-    match = re.search(r"\d+", line)
+    match = _NUMBER_RE.search(line)
     if match:
         return int(match.group())
     return 0
@@ -314,31 +499,10 @@ def _extract_size_bytes(line: str) -> int:
     - "45 MB"
     - "2.0 GiB"
     """
-    import re
-
-    # Try to find number with unit
-    match = re.search(r"([\d.]+)\s*([KMGT]i?B?)?", line, re.IGNORECASE)
+    match = _SIZE_RE.search(line)
     if not match:
         return 0
 
     value = float(match.group(1))
     unit = (match.group(2) or "").upper()
-
-    multipliers = {
-        "": 1,
-        "B": 1,
-        "K": 1024,
-        "KB": 1024,
-        "KIB": 1024,
-        "M": 1024**2,
-        "MB": 1024**2,
-        "MIB": 1024**2,
-        "G": 1024**3,
-        "GB": 1024**3,
-        "GIB": 1024**3,
-        "T": 1024**4,
-        "TB": 1024**4,
-        "TIB": 1024**4,
-    }
-
-    return int(value * multipliers.get(unit, 1))
+    return int(value * _SIZE_MULTIPLIERS.get(unit, 1))
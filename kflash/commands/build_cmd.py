@@ -17,12 +17,19 @@ from ._common import emit_output_tail
 
 
 def cmd_build(
-    registry: Registry, device_key: str, em: Emitter, decider: DecisionProvider
+    registry: Registry,
+    device_key: str,
+    em: Emitter,
+    decider: DecisionProvider,
+    incremental: bool = False,
 ) -> int:
     """Build firmware for a registered device.
 
     Orchestrates: load cached config -> menuconfig -> save config -> MCU validation -> build
 
+    ``incremental=True`` skips ``make clean`` (the future ``--incremental``
+    flag of the CLI front door).
+
     No TUI caller yet -- this is the CLI ``kflash build <name>`` front door (Phase 4).
     """
     # Load device entry
@@ -62,8 +69,11 @@ def cmd_build(
         return outcome.exit_code
 
     # Build
-    em.info("Build", "Running make clean + make...")
-    result = run_build(klipper_dir)
+    if incremental:
+        em.info("Build", "Running incremental make...")
+    else:
+        em.info("Build", "Running make clean + make...")
+    result = run_build(klipper_dir, clean="never" if incremental else "always")
 
     if not result.success:
         emit_output_tail(em, result.error_output)
@@ -6,12 +6,13 @@ via ``DecisionProvider``.
 
 from __future__ import annotations
 
+import concurrent.futures
 import os
 import shutil
 import tempfile
 import time
 from datetime import datetime
-from typing import cast
+from typing import Optional, cast
 
 from ..blocklist import blocked_reason_for_entry, build_blocked_list
 from ..build import run_build
@@ -20,7 +21,7 @@ from ..decisions import ConfirmDecision, DecisionProvider
 from ..discovery import (
     extract_mcu_from_serial,
     match_device,
-    match_devices,
+    match_registered_devices,
     preflight_can_interface,
     scan_serial_devices,
 )
@@ -32,7 +33,7 @@ from ..flash_steps import (
     resolve_ccache_usage,
     run_flash_sequence,
 )
-from ..models import BatchDeviceResult
+from ..models import BatchDeviceResult, DeviceEntry
 from ..moonraker import (
     detect_firmware_flavor,
     get_host_klipper_version,
@@ -117,6 +118,34 @@ def _should_apply_flash_all_stagger(previous_result) -> bool:
     return msg.startswith("bootloader:")
 
 
+def _device_mcu_version(
+    entry: DeviceEntry,
+    mcu_versions: dict[str, str],
+    canbus_map: Optional[dict[str, str]],
+) -> Optional[str]:
+    """Look up *entry*'s MCU version in the already-fetched snapshot.
+
+    CAN devices resolve through Moonraker's UUID -> MCU object map. A UUID
+    that map does not know (including an empty map) yields None, so the
+    device skips both the outdated classification and the downgrade check
+    and is listed as unknown-version instead. Only when the map could not
+    be fetched at all do CAN devices fall back to the MCU-type lookup.
+    """
+    if entry.is_can_device and canbus_map is not None:
+        can_mcu_name = canbus_map.get(entry.canbus_uuid or "")
+        if not can_mcu_name:
+            return None  # UUID not in Moonraker -- unknown version
+        return get_mcu_version_for_device(mcu_name=can_mcu_name, _mcu_versions=mcu_versions)
+    return get_mcu_version_for_device(
+        entry.mcu,
+        device_name=entry.name,
+        device_key=entry.key,
+        mcu_name=entry.mcu_name,
+        _mcu_versions=mcu_versions,
+        allow_fuzzy_fallback=True,
+    )
+
+
 def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
     """Build and flash firmware for all registered flashable devices.
 
@@ -186,6 +215,8 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
         return 1
 
     flashable_devices = unblocked_devices
+    # One manager per device, shared by the Stage 1 checks and the Stage 3 build
+    config_mgrs = {entry.key: ConfigManager(entry.key, klipper_dir) for entry in flashable_devices}
 
     # Seeded-but-unreviewed configs never reach a batch build: Flash All cannot
     # run menuconfig, so the mandatory one-time review of an auto-seeded config
@@ -193,7 +224,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
     seeded_devices: list = []
     reviewed_devices: list = []
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
+        config_mgr = config_mgrs[entry.key]
         if config_mgr.is_seeded():
             seeded_devices.append(entry)
         else:
@@ -214,7 +245,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
     # Check cached configs exist
     missing_configs: list[str] = []
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
+        config_mgr = config_mgrs[entry.key]
         if not config_mgr.cache_path.exists():
             missing_configs.append(entry.name)
 
@@ -225,13 +256,13 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
         em.error("Flash each device individually and save config before using Flash All.")
         return 1
 
-    # Validate MCU match for each cached config
+    # Validate MCU match for each cached config (read in place; Stage 3
+    # copies each one into klipper/.config right before its build)
     mcu_mismatches: list[tuple[str, str, str]] = []
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
+        config_mgr = config_mgrs[entry.key]
         try:
-            config_mgr.load_cached_config()
-            is_match, actual_mcu = config_mgr.validate_mcu(entry.mcu)
+            is_match, actual_mcu = config_mgr.validate_cached_mcu(entry.mcu)
             if not is_match:
                 mcu_mismatches.append((entry.name, entry.mcu, actual_mcu or "unknown"))
         except ConfigError:
@@ -246,7 +277,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
 
     # Display config ages and warn on stale configs
     for entry in flashable_devices:
-        config_mgr = ConfigManager(entry.key, klipper_dir)
+        config_mgr = config_mgrs[entry.key]
         age_display = config_mgr.get_cache_age_display()
         age_str = age_display or "unknown"
         em.info("", f"  {entry.name}: config cached {age_str}")
@@ -273,9 +304,22 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
     em.step_divider()
 
     # === Stage 2: Version check ===
-    host_version = get_host_klipper_version(klipper_dir)
-    mcu_versions = get_mcu_versions()
-    canbus_map = get_mcu_canbus_map()
+    # git describe and the Moonraker queries are independent I/O: overlap them
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        host_future = pool.submit(get_host_klipper_version, klipper_dir)
+        versions_future = pool.submit(get_mcu_versions)
+        canbus_future = pool.submit(get_mcu_canbus_map)
+    host_version = host_future.result()
+    mcu_versions = versions_future.result()
+    canbus_map = canbus_future.result()
+    # Resolve every device once; drives both the outdated classification
+    # below and the downgrade check before the build
+    device_versions: dict[str, Optional[str]] = {}
+    if mcu_versions is not None:
+        device_versions = {
+            entry.key: _device_mcu_version(entry, mcu_versions, canbus_map)
+            for entry in flashable_devices
+        }
 
     flash_list = list(flashable_devices)
 
@@ -288,21 +332,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
         unknown_version: list = []
 
         for entry in flashable_devices:
-            if entry.is_can_device and canbus_map is not None:
-                # CAN version check: use UUID-to-MCU mapping
-                can_mcu_name = canbus_map.get(entry.canbus_uuid or "")
-                if can_mcu_name:
-                    mcu_ver = get_mcu_version_for_device(mcu_name=can_mcu_name)
-                else:
-                    mcu_ver = None  # UUID not in Moonraker -- unknown version
-            else:
-                mcu_ver = get_mcu_version_for_device(
-                    entry.mcu,
-                    device_name=entry.name,
-                    device_key=entry.key,
-                    mcu_name=entry.mcu_name,
-                    allow_fuzzy_fallback=True,
-                )
+            mcu_ver = device_versions[entry.key]
 
             if entry.is_can_device and mcu_ver is None and canbus_map is not None:
                 # Moonraker reachable but UUID not found -- unknown version
@@ -386,20 +416,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
 
     if host_version and mcu_versions:
         for entry in flash_list:
-            if entry.is_can_device and canbus_map:
-                can_mcu_name = canbus_map.get(entry.canbus_uuid or "")
-                if can_mcu_name:
-                    mcu_ver = get_mcu_version_for_device(mcu_name=can_mcu_name)
-                else:
-                    mcu_ver = None
-            else:
-                mcu_ver = get_mcu_version_for_device(
-                    entry.mcu,
-                    device_name=entry.name,
-                    device_key=entry.key,
-                    mcu_name=entry.mcu_name,
-                    allow_fuzzy_fallback=True,
-                )
+            mcu_ver = device_versions.get(entry.key)
             if mcu_ver:
                 try:
                     downgrade = detect_downgrade(host_version, mcu_ver)
@@ -417,12 +434,35 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
     total = len(flash_list)
     service_restart_failed = False
 
+    # Byte-identical cached configs (e.g. twin toolheads) produce the same
+    # image: build it once and copy it for the rest.
+    # Maps config contents -> (device name, staged firmware path).
+    built_images: dict[bytes, tuple[str, str]] = {}
+
     try:
         for i, (entry, result) in enumerate(zip(flash_list, results)):
             if i > 0:
                 em.device_divider(i + 1, total, entry.name)
+            config_mgr = config_mgrs[entry.key]
+            try:
+                config_bytes: Optional[bytes] = config_mgr.cache_path.read_bytes()
+            except OSError:
+                config_bytes = None
+            reused = built_images.get(config_bytes) if config_bytes is not None else None
+            if reused is not None:
+                source_name, source_path = reused
+                device_fw_dir = os.path.join(temp_dir, entry.key)
+                os.makedirs(device_fw_dir, exist_ok=True)
+                fw_name = os.path.basename(source_path)
+                shutil.copy2(source_path, os.path.join(device_fw_dir, fw_name))
+                result.firmware_name = fw_name
+                result.build_ok = True
+                em.success(
+                    f"{entry.name} built ({i + 1}/{total}) -- same config as {source_name}"
+                )
+                continue
+
             em.info("Build", f"Building {i + 1}/{total}: {entry.name}...")
-            config_mgr = ConfigManager(entry.key, klipper_dir)
             config_mgr.load_cached_config()
 
             build_result = run_build(klipper_dir, use_ccache=use_ccache)
@@ -449,6 +489,8 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
                 shutil.copy2(fw_src, fw_dst)
                 result.firmware_name = fw_name
                 result.build_ok = True
+                if config_bytes is not None:
+                    built_images[config_bytes] = (entry.name, fw_dst)
                 if build_result.ccache_stats:
                     result.ccache_stats = build_result.ccache_stats
                     result.ccache_hit_rate = build_result.ccache_stats.hit_rate
@@ -487,14 +529,14 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
             # Re-scan USB after Klipper stop
             usb_devices = scan_serial_devices()
 
-            # Duplicate USB match detection (mirrors cmd_flash logic)
-            # CAN devices have no serial_pattern so skip them
-            ambiguous_keys: set[str] = set()
-            for entry, _ in built_results:
-                if entry.serial_pattern is not None:
-                    matches = match_devices(entry.serial_pattern, usb_devices)
-                    if len(matches) > 1:
-                        ambiguous_keys.add(entry.key)
+            # Duplicate USB match detection (mirrors cmd_flash logic), with the
+            # scan indexed once for every pattern; CAN entries are skipped
+            usb_matches = match_registered_devices(
+                usb_devices, {entry.key: entry for entry, _ in built_results}
+            )
+            ambiguous_keys = {key for key, matches in usb_matches.items() if len(matches) > 1}
+            # usb_matches answers lookups until the first rescan replaces the list
+            indexed_devices = usb_devices
 
             # CAN interface preflight cache (keyed by interface name)
             can_preflight_cache: dict[str, bool] = {}
@@ -596,9 +638,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
                         result.verify_ok = True
                         registry.update_device(
                             entry.key,
-                            last_flash_timestamp=(
-                                datetime.now().replace(microsecond=0).isoformat()
-                            ),
+                            last_flash_timestamp=datetime.now().isoformat(timespec="seconds"),
                         )
                         em.success(
                             f"{entry.name} flashed and verified"
@@ -623,7 +663,11 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
                         continue
 
                     # Find device
-                    usb_device = match_device(entry.serial_pattern, usb_devices)
+                    if usb_devices is indexed_devices:
+                        indexed = usb_matches.get(entry.key)
+                        usb_device = indexed[0] if indexed else None
+                    else:
+                        usb_device = match_device(entry.serial_pattern, usb_devices)
                     if usb_device is None:
                         result.error_message = "Device not found on USB"
                         em.warn(
@@ -707,9 +751,7 @@ def cmd_flash_all(registry, em: Emitter, decider: DecisionProvider) -> int:
                         # Record flash timestamp
                         registry.update_device(
                             entry.key,
-                            last_flash_timestamp=(
-                                datetime.now().replace(microsecond=0).isoformat()
-                            ),
+                            last_flash_timestamp=datetime.now().isoformat(timespec="seconds"),
                         )
                         em.success(
                             f"{entry.name} flashed and verified"
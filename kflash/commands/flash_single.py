@@ -8,7 +8,7 @@ from __future__ import annotations
 import sys
 import time
 from datetime import datetime
-from typing import cast
+from typing import Optional, cast
 
 from ..blocklist import (
     blocked_reason_for_entry,
@@ -27,7 +27,7 @@ from ..discovery import (
     find_registered_devices,
     is_supported_device,
     match_device,
-    match_devices,
+    match_registered_devices,
     preflight_can_interface,
     scan_serial_devices,
 )
@@ -43,6 +43,7 @@ from ..flash_steps import (
     run_flash_sequence,
 )
 from ..flasher import verify_device_path
+from ..models import DeviceEntry
 from ..moonraker import (
     detect_firmware_flavor,
     get_host_klipper_version,
@@ -65,6 +66,22 @@ from ..service import (
 from ._common import _short_path, emit_output_tail
 
 
+def _device_mcu_version(
+    entry: DeviceEntry, mcu_versions: dict[str, str], cache: dict[str, Optional[str]]
+) -> Optional[str]:
+    """Look up *entry*'s MCU version in the already-fetched snapshot, once per device."""
+    if entry.key not in cache:
+        cache[entry.key] = get_mcu_version_for_device(
+            entry.mcu,
+            device_name=entry.name,
+            device_key=entry.key,
+            mcu_name=entry.mcu_name,
+            _mcu_versions=mcu_versions,
+            allow_fuzzy_fallback=True,
+        )
+    return cache[entry.key]
+
+
 def cmd_flash(
     registry, device_key, em: Emitter, decider: DecisionProvider, skip_menuconfig: bool = False
 ) -> int:
@@ -94,17 +111,18 @@ def cmd_flash(
     # Fetch version information early for display in device selection
     mcu_versions = get_mcu_versions()
     host_version = get_host_klipper_version(data.global_config.klipper_dir)
+    # Per-device lookups into mcu_versions, shared by the selection display
+    # and the downgrade check
+    device_versions: dict[str, Optional[str]] = {}
 
     # === Phase 1: Discovery ===
     em.phase("Discovery", "Scanning for USB devices...")
     usb_devices = scan_serial_devices()
-    duplicate_matches: dict[str, list] = {}
-    for entry in data.devices.values():
-        if entry.serial_pattern is None:
-            continue  # CAN devices have no USB serial pattern
-        matches = match_devices(entry.serial_pattern, usb_devices)
-        if len(matches) > 1:
-            duplicate_matches[entry.key] = matches
+    duplicate_matches = {
+        key: matches
+        for key, matches in match_registered_devices(usb_devices, data.devices).items()
+        if len(matches) > 1
+    }
     blocked_entries: dict[str, str] = {}
     for entry in data.devices.values():
         reason = blocked_reason_for_entry(entry, blocked_list)
@@ -117,14 +135,17 @@ def cmd_flash(
             em.error("No USB devices found. Connect a board and try again.")
             return 1
 
-        # Cross-reference with registry
-        matched, unmatched = find_registered_devices(usb_devices, data.devices)
+        # Cross-reference with registry once; the blocked listings below
+        # reuse the unfiltered matches
+        all_matched, unmatched = find_registered_devices(usb_devices, data.devices)
+        blocked_connected = [(e, d) for e, d in all_matched if e.key in blocked_entries]
 
         # Remove any entries with duplicate USB IDs or blocked status from selectable list
-        if duplicate_matches:
-            matched = [(e, d) for e, d in matched if e.key not in duplicate_matches]
-        if blocked_entries:
-            matched = [(e, d) for e, d in matched if e.key not in blocked_entries]
+        matched = [
+            (e, d)
+            for e, d in all_matched
+            if e.key not in duplicate_matches and e.key not in blocked_entries
+        ]
 
         if not matched:
             if duplicate_matches:
@@ -146,26 +167,20 @@ def cmd_flash(
                     em.device_line("DUP", f"{entry.name} ({entry.mcu}) [duplicate]", details)
                 return 1
 
-            if blocked_entries:
-                blocked_connected = [
-                    (entry, device)
-                    for entry, device in find_registered_devices(usb_devices, data.devices)[0]
-                    if entry.key in blocked_entries
-                ]
-                if blocked_connected:
-                    em.error_with_recovery(
-                        "Blocked devices",
-                        "Connected registered devices are blocked and cannot be flashed",
-                        recovery=(
-                            "1. Remove blocked entries from devices.json\n"
-                            "2. Or connect a flashable device"
-                        ),
-                    )
-                    em.phase("Discovery", "Blocked registered devices:")
-                    for entry, _device in blocked_connected:
-                        reason = blocked_entries.get(entry.key, "Blocked by policy")
-                        em.device_line("BLK", f"{entry.name} ({entry.mcu}) [blocked]", reason)
-                    return 1
+            if blocked_connected:
+                em.error_with_recovery(
+                    "Blocked devices",
+                    "Connected registered devices are blocked and cannot be flashed",
+                    recovery=(
+                        "1. Remove blocked entries from devices.json\n"
+                        "2. Or connect a flashable device"
+                    ),
+                )
+                em.phase("Discovery", "Blocked registered devices:")
+                for entry, _device in blocked_connected:
+                    reason = blocked_entries.get(entry.key, "Blocked by policy")
+                    em.device_line("BLK", f"{entry.name} ({entry.mcu}) [blocked]", reason)
+                return 1
 
             recovery = (
                 "1. Press D to refresh devices\n"
@@ -209,17 +224,11 @@ def cmd_flash(
             for entry, device in excluded_matched:
                 em.device_line("REG", f"{entry.name} ({entry.mcu}) [excluded]", device.filename)
 
-        if blocked_entries:
-            blocked_connected = [
-                (entry, device)
-                for entry, device in find_registered_devices(usb_devices, data.devices)[0]
-                if entry.key in blocked_entries
-            ]
-            if blocked_connected:
-                em.phase("Discovery", "Blocked devices (not selectable):")
-                for entry, _device in blocked_connected:
-                    reason = blocked_entries.get(entry.key, "Blocked by policy")
-                    em.device_line("BLK", f"{entry.name} ({entry.mcu}) [blocked]", reason)
+        if blocked_connected:
+            em.phase("Discovery", "Blocked devices (not selectable):")
+            for entry, _device in blocked_connected:
+                reason = blocked_entries.get(entry.key, "Blocked by policy")
+                em.device_line("BLK", f"{entry.name} ({entry.mcu}) [blocked]", reason)
 
         if not flashable_matched:
             template = ERROR_TEMPLATES["device_excluded"]
@@ -236,13 +245,7 @@ def cmd_flash(
             em.device_line(str(i + 1), f"{entry.name} ({entry.mcu})", device.filename)
             # Show MCU software version if available
             if mcu_versions:
-                version = get_mcu_version_for_device(
-                    entry.mcu,
-                    device_name=entry.name,
-                    device_key=entry.key,
-                    mcu_name=entry.mcu_name,
-                    allow_fuzzy_fallback=True,
-                )
+                version = _device_mcu_version(entry, mcu_versions, device_versions)
                 if version:
                     em.info("", f"     MCU software version: {version}")
 
@@ -283,8 +286,9 @@ def cmd_flash(
             device_key = entry.key
             device_path = usb_device.path
     else:
-        # Verify device exists and is connected
-        entry = registry.get(device_key)
+        # Verify device exists and is connected (registry.get would re-read
+        # devices.json; the loaded data is already in hand)
+        entry = data.devices.get(device_key)
         if entry is None:
             template = ERROR_TEMPLATES["device_not_registered"]
             em.error_with_recovery(
@@ -382,8 +386,6 @@ def cmd_flash(
             ):
                 return 0
 
-    # Load the device entry for the rest of the workflow
-    entry = registry.get(device_key)
     global_config = data.global_config
     klipper_dir = global_config.klipper_dir
     katapult_dir = global_config.katapult_dir
@@ -426,8 +428,9 @@ def cmd_flash(
             emit_host_and_mcu_versions(em, host_version, mcu_versions, target_mcu)
 
             # Check if target MCU is outdated or already current
-            if target_mcu and target_mcu in mcu_versions:
-                if is_mcu_outdated(host_version, mcu_versions[target_mcu]):
+            target_ver = mcu_versions.get(target_mcu) if target_mcu else None
+            if target_ver is not None:
+                if is_mcu_outdated(host_version, target_ver):
                     em.warn("MCU firmware is behind host Klipper - update recommended")
                 elif not decider.confirm(
                     ConfirmDecision(
@@ -476,13 +479,7 @@ def cmd_flash(
         em.phase("Safety", "Warning: Klipper repo has uncommitted changes")
 
     if host_version and mcu_versions:
-        target_mcu_ver = get_mcu_version_for_device(
-            entry.mcu,
-            device_name=entry.name,
-            device_key=entry.key,
-            mcu_name=entry.mcu_name,
-            allow_fuzzy_fallback=True,
-        )
+        target_mcu_ver = _device_mcu_version(entry, mcu_versions, device_versions)
         if target_mcu_ver:
             try:
                 downgrade = detect_downgrade(host_version, target_mcu_ver)
@@ -494,7 +491,10 @@ def cmd_flash(
             except (ValueError, TypeError):
                 pass  # Non-parseable versions, skip check
 
-    em.phase("Build", "Running make clean + make...")
+    if use_ccache:
+        em.phase("Build", "Running make (ccache: skipping make clean)...")
+    else:
+        em.phase("Build", "Running make clean + make...")
     build_result = run_build(klipper_dir, timeout=TIMEOUT_BUILD, use_ccache=use_ccache)
 
     if not build_result.success:
@@ -565,13 +565,14 @@ def cmd_flash(
             return 1
 
     # Acquire sudo credentials if service is active and passwordless sudo is missing
-    if _is_service_active() and not verify_passwordless_sudo():
+    service_active = _is_service_active()
+    if service_active and not verify_passwordless_sudo():
         em.phase("Flash", "Sudo authentication required for service management")
         if not acquire_sudo():
             em.error("Failed to acquire sudo credentials. Cannot manage Klipper service.")
             return 1
 
-    if _is_service_active():
+    if service_active:
         em.phase("Flash", "Stopping Klipper...")
     flash_start = time.monotonic()
     service_restart_failed = False
@@ -623,7 +624,7 @@ def cmd_flash(
         # Record flash timestamp
         registry.update_device(
             device_key,
-            last_flash_timestamp=datetime.now().replace(microsecond=0).isoformat(),
+            last_flash_timestamp=datetime.now().isoformat(timespec="seconds"),
         )
         em.success(f"Flashed {entry.name} via {step.method} in {flash_elapsed:.1f}s")
         if step.device_path_new:
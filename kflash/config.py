@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
+import mmap
 import os
-import re
 import shutil
 import tempfile
 import time
 from pathlib import Path
-from typing import Optional
+from typing import IO, Optional
 
 from .errors import ConfigError, format_error
 
@@ -25,6 +25,17 @@ def xdg_base() -> Path:
     return Path.home() / ".config"
 
 
+def safe_mtime(path: Path) -> Optional[float]:
+    """Return the file's mtime, or None if it does not exist (one stat call).
+
+    Public: shared by build.py for the menuconfig saved-changes check.
+    """
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
 def get_config_dir(device_key: str) -> Path:
     """Get XDG config directory for a device.
 
@@ -69,31 +80,64 @@ def rename_device_config_cache(old_key: str, new_key: str) -> bool:
     return True
 
 
+_MCU_PREFIX = b'CONFIG_MCU="'
+_BOARD_DIR_PREFIX = b'CONFIG_BOARD_DIRECTORY="'
+
+
+def _find_quoted_value(mm: mmap.mmap, prefix: bytes) -> Optional[str]:
+    """Return the first non-empty quoted value of a line starting with *prefix*."""
+    needle = b"\n" + prefix
+    if mm[: len(prefix)] == prefix:
+        start = len(prefix)
+    else:
+        pos = mm.find(needle)
+        if pos < 0:
+            return None
+        start = pos + len(needle)
+    while True:
+        end = mm.find(b'"', start)
+        eol = mm.find(b"\n", start)
+        if end > start and (eol < 0 or end < eol):
+            return mm[start:end].decode("utf-8", "replace")
+        pos = mm.find(needle, start)
+        if pos < 0:
+            return None
+        start = pos + len(needle)
+
+
+def _read_mcu(config_path: str) -> Optional[str]:
+    """Find CONFIG_MCU (else CONFIG_BOARD_DIRECTORY) in a .config file.
+
+    The file is memory-mapped and searched in place, so only the pages up to
+    the match (near the top: Kconfig writes board settings first) are read
+    and nothing is decoded but the value itself.
+
+    Raises:
+        OSError: If the file cannot be opened (FileNotFoundError if missing).
+    """
+    with open(config_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mcu = _find_quoted_value(mm, _MCU_PREFIX)
+            if mcu is not None:
+                return mcu
+            # Fallback: CONFIG_BOARD_DIRECTORY="rp2040" (some archs have no CONFIG_MCU)
+            return _find_quoted_value(mm, _BOARD_DIR_PREFIX)
+
+
 def parse_mcu_from_config(config_path: str) -> Optional[str]:
     """Extract MCU type from .config file.
 
     Returns e.g., 'stm32h723xx', 'rp2040', or None if not found.
     """
-    path = Path(config_path)
-    if not path.exists():
-        return None
-
     try:
-        content = path.read_text(encoding="utf-8")
+        return _read_mcu(config_path)
     except OSError:
         return None
 
-    # Match: CONFIG_MCU="stm32h723xx"
-    match = re.search(r'^CONFIG_MCU="([^"]+)"', content, re.MULTILINE)
-    if match:
-        return match.group(1)
-
-    # Fallback: CONFIG_BOARD_DIRECTORY="rp2040" (some archs have no CONFIG_MCU)
-    match = re.search(r'^CONFIG_BOARD_DIRECTORY="([^"]+)"', content, re.MULTILINE)
-    return match.group(1) if match else None
-
 
-def _atomic_copy(src: str, dst: str) -> None:
+def _atomic_copy(src: str, dst: str, drop_source_cache: bool = False) -> None:
     """Copy file atomically: copy to temp, rename.
 
     Creates destination directory if needed.
@@ -103,6 +147,13 @@ def _atomic_copy(src: str, dst: str) -> None:
     journal commit that blocks while *all* pending dirty pages are flushed.
     After a firmware build this can stall for 30+ seconds.  The atomic
     rename already provides sufficient consistency for config-file caching.
+
+    With *drop_source_cache*, the source's pages are dropped from the page
+    cache once copied so config churn does not evict the source tree a build
+    is about to read. Only the load direction asks for this: there the
+    source is the cache file, which is not read again, whereas a save's
+    source is klipper/.config, which make reads right afterwards. The
+    destination is never advised (its pages are still dirty anyway).
     """
     dst_dir = os.path.dirname(os.path.abspath(dst))
     os.makedirs(dst_dir, exist_ok=True)
@@ -111,14 +162,60 @@ def _atomic_copy(src: str, dst: str) -> None:
         tmp_path = tf.name
         try:
             with open(src, "rb") as sf:
-                shutil.copyfileobj(sf, tf)
-            tf.flush()
+                _copy_contents(sf, tf)
+                if drop_source_cache:
+                    _drop_page_cache(sf.fileno())
         except BaseException:
             os.unlink(tmp_path)
             raise
     os.replace(tmp_path, dst)
 
 
+def _copy_contents(sf: IO[bytes], tf: IO[bytes]) -> None:
+    """Copy an open source file into an open, empty destination file.
+
+    Uses os.sendfile so the bytes never pass through Python buffers; falls
+    back to shutil.copyfileobj where sendfile is unavailable or refused
+    (non-Linux platforms, some filesystems).
+    """
+    try:
+        src_fd, dst_fd = sf.fileno(), tf.fileno()
+        remaining = os.fstat(src_fd).st_size
+        offset = 0
+        while remaining > 0:
+            sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+            if sent == 0:
+                break  # source shrank underneath us
+            offset += sent
+            remaining -= sent
+        return
+    except (AttributeError, OSError):
+        pass
+    # Restart from scratch so a partial sendfile cannot leave stray bytes.
+    sf.seek(0)
+    tf.seek(0)
+    tf.truncate()
+    shutil.copyfileobj(sf, tf)
+
+
+def _drop_page_cache(fd: int) -> None:
+    """Hint the kernel that *fd*'s cached pages will not be needed again."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass  # advisory only
+
+
+def _match_mcu(actual_mcu: Optional[str], expected_mcu: str) -> tuple[bool, Optional[str]]:
+    """(is_match, actual_mcu) for a parsed CONFIG_MCU; "unknown" when absent."""
+    if actual_mcu is None:
+        return False, "unknown"
+    # Prefix match: device registry may have 'stm32h723', config has 'stm32h723xx'
+    is_match = actual_mcu.startswith(expected_mcu) or expected_mcu.startswith(actual_mcu)
+    return is_match, actual_mcu
+
+
 class ConfigManager:
     """Manage per-device Klipper .config caching.
 
@@ -154,7 +251,7 @@ class ConfigManager:
         # Ensure klipper directory exists
         self.klipper_dir.mkdir(parents=True, exist_ok=True)
 
-        _atomic_copy(str(self.cache_path), str(self.klipper_config_path))
+        _atomic_copy(str(self.cache_path), str(self.klipper_config_path), drop_source_cache=True)
         return True
 
     def clear_klipper_config(self) -> bool:
@@ -348,7 +445,9 @@ class ConfigManager:
         Raises:
             ConfigError: If .config doesn't exist or has no CONFIG_MCU
         """
-        if not self.klipper_config_path.exists():
+        try:
+            actual_mcu = _read_mcu(str(self.klipper_config_path))
+        except FileNotFoundError:
             msg = format_error(
                 "Config error",
                 "No .config file for MCU validation",
@@ -359,16 +458,33 @@ class ConfigManager:
                     f"3. Check: ls {self.klipper_dir}/.config"
                 ),
             )
-            raise ConfigError(msg)
+            raise ConfigError(msg) from None
+        except OSError:
+            actual_mcu = None
+        return _match_mcu(actual_mcu, expected_mcu)
 
-        actual_mcu = parse_mcu_from_config(str(self.klipper_config_path))
-        if actual_mcu is None:
-            return False, "unknown"
+    def validate_cached_mcu(self, expected_mcu: str) -> tuple[bool, Optional[str]]:
+        """Validate MCU type in the cached .config, read in place.
 
-        # Prefix match: device registry may have 'stm32h723', config has 'stm32h723xx'
-        is_match = actual_mcu.startswith(expected_mcu) or expected_mcu.startswith(actual_mcu)
+        Same matching as :meth:`validate_mcu`, without first copying the cache
+        over klipper/.config -- lets a batch vet every device's cache up front.
 
-        return is_match, actual_mcu
+        Raises:
+            ConfigError: If no cached config exists for this device
+        """
+        try:
+            actual_mcu = _read_mcu(str(self.cache_path))
+        except FileNotFoundError:
+            msg = format_error(
+                "Config error",
+                "No cached config for MCU validation",
+                context={"device": self.device_key, "path": str(self.cache_path)},
+                recovery="Flash the device individually and save its config first",
+            )
+            raise ConfigError(msg) from None
+        except OSError:
+            actual_mcu = None
+        return _match_mcu(actual_mcu, expected_mcu)
 
     def get_mtime(self) -> Optional[float]:
         """Get modification time of klipper .config file.
@@ -376,9 +492,7 @@ class ConfigManager:
         Returns mtime in seconds since epoch, or None if file doesn't exist.
         Used to detect if menuconfig saved changes.
         """
-        if not self.klipper_config_path.exists():
-            return None
-        return self.klipper_config_path.stat().st_mtime
+        return safe_mtime(self.klipper_config_path)
 
     def has_cached_config(self) -> bool:
         """Check if cached config exists for this device."""
@@ -389,9 +503,7 @@ class ConfigManager:
 
         Returns mtime in seconds since epoch, or None if no cache exists.
         """
-        if not self.cache_path.exists():
-            return None
-        return self.cache_path.stat().st_mtime
+        return safe_mtime(self.cache_path)
 
     def get_cache_age_display(self) -> Optional[str]:
         """Get human-readable age of cached config.
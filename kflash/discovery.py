@@ -2,22 +2,36 @@
 
 from __future__ import annotations
 
+import bisect
 import fnmatch
+import functools
+import operator
 import os
 import re
 import time
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-from . import runner
+from . import _canbus, _netlink, runner
+from ._netlink import LinkInfo
 from .events import Emitter, NullSink
-from .models import DiscoveredCanDevice, DiscoveredDevice
+from .models import DeviceEntry, DiscoveredCanDevice, DiscoveredDevice
 
 SERIAL_BY_ID = "/dev/serial/by-id"
 
 # Supported device prefixes for Klipper/Katapult USB IDs (case-insensitive)
 SUPPORTED_PREFIXES = ("usb-klipper_", "usb-katapult_")
 
+# MCU type in a Klipper/Katapult by-id filename (variant suffix like xx/xe dropped)
+_MCU_RE = re.compile(r"usb-(?:Klipper|katapult)_([a-z0-9]+?)(?:x[a-z0-9]*)?_", re.IGNORECASE)
+
+# USB interface suffix of a by-id filename ("-if00")
+_IF_SUFFIX_RE = re.compile(r"-if\d+$")
+
+# First glob metacharacter (ends a pattern's literal prefix)
+_GLOB_META_RE = re.compile(r"[*?\[]")
+
 # sysfs path for network interface detection (monkeypatched in tests)
 _SYSFS_NET = "/sys/class/net"
 
@@ -27,36 +41,37 @@ _CAN_IFACE_RE = re.compile(r"^can\d+$")
 # ARPHRD_CAN hardware type value from linux/if_arp.h
 _ARPHRD_CAN = 280
 
+# Seconds a CAN interface enumeration is reused before sysfs is re-read
+CAN_INTERFACES_TTL = 2.0
+
 # Minimum transmit queue length for CAN operations
 MINIMUM_CAN_QLEN = 128
 
 # Subprocess timeout for flashtool.py -q (seconds)
 TIMEOUT_CAN_QUERY = 15
 
+# Seconds to collect replies to a direct CAN query (flashtool.py -q's window)
+CAN_QUERY_LISTEN = 2.0
+
 # Regex for flashtool.py -q output parsing (verified from flashtool.py source line 723)
 _CAN_QUERY_RE = re.compile(r"Detected UUID:\s+([0-9a-f]{12}),\s+Application:\s+(\S+)")
+# Same pattern over raw bytes, so only the matched groups ever get decoded
+_CAN_QUERY_RE_B = re.compile(rb"Detected UUID:\s+([0-9a-f]{12}),\s+Application:\s+(\S+)")
 
 
 def scan_serial_devices() -> list:
     """Scan /dev/serial/by-id/ and return all USB serial devices."""
-    serial_dir = Path(SERIAL_BY_ID)
-    if not serial_dir.is_dir():
+    try:
+        with os.scandir(SERIAL_BY_ID) as it:
+            entries = sorted(it, key=operator.attrgetter("name"))
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    devices = []
-    for entry in sorted(serial_dir.iterdir()):
-        devices.append(
-            DiscoveredDevice(
-                path=str(entry),
-                filename=entry.name,
-            )
-        )
-    return devices
+    return [DiscoveredDevice(path=entry.path, filename=entry.name) for entry in entries]
 
 
 def is_supported_device(filename: str) -> bool:
     """Return True if filename looks like a Klipper/Katapult USB device."""
-    lower = filename.lower()
-    return any(lower.startswith(prefix) for prefix in SUPPORTED_PREFIXES)
+    return filename.lower().startswith(SUPPORTED_PREFIXES)
 
 
 def is_katapult_device(filename: str) -> bool:
@@ -66,27 +81,43 @@ def is_katapult_device(filename: str) -> bool:
 
 def match_device(pattern: str, devices: list) -> Optional[DiscoveredDevice]:
     """Find first device whose filename matches a glob pattern."""
-    matches = match_devices(pattern, devices)
-    return matches[0] if matches else None
+    regexes = _compiled_variants(pattern)
+    for device in devices:
+        if any(regex.match(device.filename) for regex in regexes):
+            return device
+    return None
 
 
-def prefix_variants(pattern: str) -> list[str]:
+def prefix_variants(pattern: str) -> tuple[str, ...]:
     """Return pattern variants with both Klipper_ and katapult_ prefixes.
 
     A pattern like ``usb-katapult_rp2040_30*`` returns both itself and
     ``usb-Klipper_rp2040_30*`` so matching works regardless of which
     bootloader mode the device booted into.
     """
-    lower = pattern.lower()
-    klipper_prefix = "usb-klipper_"
-    katapult_prefix = "usb-katapult_"
-    if lower.startswith("usb-klipper_"):
-        alt = katapult_prefix + pattern[len(klipper_prefix) :]
-        return [pattern, alt]
-    if lower.startswith("usb-katapult_"):
-        alt = "usb-Klipper_" + pattern[len(katapult_prefix) :]
-        return [pattern, alt]
-    return [pattern]
+    # Only the prefix needs case-folding, not the whole pattern
+    head = pattern[:13].lower()
+    if head.startswith("usb-klipper_"):
+        return (pattern, "usb-katapult_" + pattern[12:])
+    if head == "usb-katapult_":
+        return (pattern, "usb-Klipper_" + pattern[13:])
+    return (pattern,)
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled_variants(pattern: str) -> tuple[re.Pattern[str], ...]:
+    """Compiled regexes for each of ``prefix_variants(pattern)``.
+
+    Same semantics as ``fnmatch.fnmatch`` on POSIX (case-sensitive), but the
+    glob is translated and compiled once per pattern rather than looked up
+    in fnmatch's small cache on every device comparison.
+    """
+    return tuple(re.compile(fnmatch.translate(v)) for v in prefix_variants(pattern))
+
+
+def pattern_matches(pattern: str, filename: str) -> bool:
+    """Return True if *filename* matches *pattern* under either USB prefix."""
+    return any(regex.match(filename) for regex in _compiled_variants(pattern))
 
 
 def match_devices(pattern: str, devices: list) -> list[DiscoveredDevice]:
@@ -96,9 +127,9 @@ def match_devices(pattern: str, devices: list) -> list[DiscoveredDevice]:
     match ``usb-Klipper_*`` filenames and vice-versa so that devices are
     found regardless of which bootloader mode they booted into.
     """
-    variants = prefix_variants(pattern)
+    regexes = _compiled_variants(pattern)
     return [
-        device for device in devices if any(fnmatch.fnmatch(device.filename, v) for v in variants)
+        device for device in devices if any(regex.match(device.filename) for regex in regexes)
     ]
 
 
@@ -118,20 +149,61 @@ def find_registered_devices(devices: list, registry_devices: dict) -> tuple:
           unmatched = list of DiscoveredDevice not matching any pattern
     """
     matched = []
-    unmatched_devices = list(devices)  # copy
+    matched_ids: set[int] = set()
+
+    for entry, hits in _iter_entry_matches(devices, registry_devices):
+        # Lowest index in `devices`, as a linear scan would find
+        device = devices[hits[0]]
+        matched.append((entry, device))
+        matched_ids.add(id(device))
+
+    unmatched_devices = [device for device in devices if id(device) not in matched_ids]
+    return matched, unmatched_devices
+
+
+def match_registered_devices(devices: list, registry_devices: dict) -> dict[str, list]:
+    """Map each USB registry key to every device its pattern matches.
+
+    Equivalent to calling :func:`match_devices` per entry (same order, same
+    prefix-agnostic matching) but with the device list indexed once. CAN
+    entries and entries matching nothing are omitted.
+    """
+    return {
+        entry.key: [devices[i] for i in hits]
+        for entry, hits in _iter_entry_matches(devices, registry_devices)
+    }
+
+
+def _iter_entry_matches(
+    devices: list, registry_devices: dict
+) -> Iterator[tuple[DeviceEntry, list[int]]]:
+    """Yield (entry, sorted device indices) for each USB entry with a match."""
+    # Index devices by filename once; each pattern then only regex-tests the
+    # slice sharing its literal prefix (found by bisection) instead of
+    # scanning every device.
+    order = sorted(range(len(devices)), key=lambda i: devices[i].filename)
+    names = [devices[i].filename for i in order]
 
     for entry in registry_devices.values():
         if entry.serial_pattern is None:
             continue  # CAN devices matched separately (Phase 51)
+        hits: set[int] = set()
         variants = prefix_variants(entry.serial_pattern)
-        for device in devices:
-            if any(fnmatch.fnmatch(device.filename, v) for v in variants):
-                matched.append((entry, device))
-                if device in unmatched_devices:
-                    unmatched_devices.remove(device)
-                break
+        for variant, regex in zip(variants, _compiled_variants(entry.serial_pattern)):
+            literal = _literal_prefix(variant)
+            k = bisect.bisect_left(names, literal)
+            while k < len(names) and names[k].startswith(literal):
+                if regex.match(names[k]):
+                    hits.add(order[k])
+                k += 1
+        if hits:
+            yield entry, sorted(hits)
 
-    return matched, unmatched_devices
+
+def _literal_prefix(glob: str) -> str:
+    """Return the part of *glob* before its first wildcard character."""
+    m = _GLOB_META_RE.search(glob)
+    return glob[: m.start()] if m else glob
 
 
 def extract_mcu_from_serial(filename: str) -> Optional[str]:
@@ -147,11 +219,7 @@ def extract_mcu_from_serial(filename: str) -> Optional[str]:
     Returns the MCU type without variant suffix (xx, xe, etc.) or None if
     pattern does not match.
     """
-    m = re.match(
-        r"usb-(?:Klipper|katapult)_([a-z0-9]+?)(?:x[a-z0-9]*)?_",
-        filename,
-        re.IGNORECASE,
-    )
+    m = _MCU_RE.match(filename)
     if m:
         return m.group(1).lower()
     return None
@@ -168,10 +236,21 @@ def generate_serial_pattern(filename: str) -> str:
         -> usb-Klipper_stm32h723xx_29001A001151313531383332*
     """
     # Strip -ifNN suffix, add wildcard
-    base = re.sub(r"-if\d+$", "", filename)
+    base = _IF_SUFFIX_RE.sub("", filename)
     return base + "*"
 
 
+# (monotonic timestamp, sysfs root, interfaces) of the last CAN enumeration
+_can_interfaces_cache: Optional[tuple[float, str, list[str]]] = None
+
+
+def reset_caches() -> None:
+    """Drop memoized discovery results (tests, or after hardware changes)."""
+    global _can_interfaces_cache
+    _can_interfaces_cache = None
+    _flashtool_path.cache_clear()
+
+
 def get_can_interfaces() -> list[str]:
     """List available real CAN interfaces from sysfs.
 
@@ -179,29 +258,97 @@ def get_can_interfaces() -> list[str]:
     with ARPHRD_CAN type (280). Excludes virtual CAN (vcan*) by name
     pattern and verifies type as safety belt.
 
+    Results are reused for CAN_INTERFACES_TTL seconds, so a dashboard
+    refresh followed by a preflight does not enumerate twice.
+
     Returns empty list silently when no CAN hardware exists or sysfs
     is unavailable (non-Linux). Callers decide presentation.
     """
+    global _can_interfaces_cache
+    now = time.monotonic()
+    cached = _can_interfaces_cache
+    if cached is not None and cached[1] == _SYSFS_NET and now - cached[0] < CAN_INTERFACES_TTL:
+        return list(cached[2])
+
+    interfaces = _scan_can_interfaces()
+    _can_interfaces_cache = (now, _SYSFS_NET, interfaces)
+    return list(interfaces)
+
+
+def _link_snapshot() -> Optional[dict[str, LinkInfo]]:
+    """One rtnetlink dump of all links, or None to fall back to sysfs."""
+    return _netlink.link_snapshot()
+
+
+def _can_names(links: dict[str, LinkInfo]) -> list[str]:
+    """Real CAN interface names in a link snapshot (same rules as sysfs scan)."""
+    return sorted(
+        name
+        for name, link in links.items()
+        if _CAN_IFACE_RE.match(name) and link.type == _ARPHRD_CAN
+    )
+
+
+def _scan_can_interfaces() -> list[str]:
+    """Uncached body of get_can_interfaces."""
+    links = _link_snapshot()
+    if links is not None:
+        return _can_names(links)
     try:
-        entries = os.listdir(_SYSFS_NET)
-    except (FileNotFoundError, OSError):
+        with os.scandir(_SYSFS_NET) as it:
+            # Filter by name before any per-interface I/O
+            names = sorted(entry.name for entry in it if _CAN_IFACE_RE.match(entry.name))
+    except OSError:
         return []
 
     interfaces = []
-    for name in sorted(entries):
-        if not _CAN_IFACE_RE.match(name):
-            continue
-        type_path = os.path.join(_SYSFS_NET, name, "type")
+    for name in names:
+        raw = _read_sysfs_attr(name, "type")
         try:
-            with open(type_path) as f:
-                iface_type = int(f.read().strip())
-            if iface_type == _ARPHRD_CAN:
+            if raw is not None and int(raw) == _ARPHRD_CAN:
                 interfaces.append(name)
-        except (FileNotFoundError, ValueError, OSError):
+        except ValueError:
             continue
     return interfaces
 
 
+def _read_sysfs_attr(interface: str, attr: str) -> Optional[bytes]:
+    """Read a small sysfs attribute with raw fd I/O; None if unreadable."""
+    try:
+        fd = os.open(f"{_SYSFS_NET}/{interface}/{attr}", os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 64).strip()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _sysfs_link(interface: str) -> LinkInfo:
+    """Type, state and qlen of one interface from sysfs, as a LinkInfo.
+
+    Unreadable attributes come back as type -1 / DOWN / qlen None, the same
+    answers is_can_interface_up and get_can_interface_qlen give.
+    """
+    if_type = _read_sysfs_int(interface, "type")
+    operstate = _read_sysfs_attr(interface, "operstate")
+    return LinkInfo(
+        type=if_type if if_type is not None else -1,
+        is_up=operstate is not None and operstate.lower() == b"up",
+        txqlen=_read_sysfs_int(interface, "tx_queue_len"),
+    )
+
+
+def _read_sysfs_int(interface: str, attr: str) -> Optional[int]:
+    raw = _read_sysfs_attr(interface, attr)
+    try:
+        return int(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
 def is_can_interface_up(interface: str) -> bool:
     """Check if a CAN interface is operationally up.
 
@@ -219,15 +366,24 @@ def is_can_interface_up(interface: str) -> bool:
         return False
 
 
-def parse_can_query_output(stdout: str) -> list[DiscoveredCanDevice]:
+def parse_can_query_output(stdout: Union[str, bytes]) -> list[DiscoveredCanDevice]:
     """Parse flashtool.py -q stdout into DiscoveredCanDevice list.
 
     Extracts UUID and Application from lines matching::
 
         Detected UUID: 48ca7afe7a44, Application: Katapult
 
+    Accepts the raw bytes of a ``text=False`` run as well as decoded text.
     Returns empty list on empty input or no matches.
     """
+    if isinstance(stdout, bytes):
+        return [
+            DiscoveredCanDevice(
+                uuid=match.group(1).decode("ascii"),
+                application=match.group(2).decode("utf-8", "replace"),
+            )
+            for match in _CAN_QUERY_RE_B.finditer(stdout)
+        ]
     results = []
     for match in _CAN_QUERY_RE.finditer(stdout):
         results.append(
@@ -244,7 +400,10 @@ def scan_can_devices(
     katapult_dir: str,
     timeout: int = TIMEOUT_CAN_QUERY,
 ) -> list[DiscoveredCanDevice]:
-    """Scan CAN bus for devices via flashtool.py -q.
+    """Scan CAN bus for devices with Katapult's admin query.
+
+    Queries the bus directly over SocketCAN when possible, otherwise runs
+    flashtool.py -q.
 
     Args:
         interface: CAN interface name (e.g., "can0").
@@ -254,14 +413,19 @@ def scan_can_devices(
     Returns:
         List of discovered CAN devices. Empty list on error.
     """
-    flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-    if not flashtool.exists():
+    devices = _socket_query(interface, CAN_QUERY_LISTEN)
+    if devices is not None:
+        return devices
+
+    flashtool = _flashtool_path(katapult_dir)
+    if flashtool is None:
         return []
 
     try:
         result = runner.run(
-            ["python3", str(flashtool), "-i", interface, "-q"],
+            ["python3", flashtool, "-i", interface, "-q"],
             timeout=timeout,
+            text=False,
         )
     except OSError:
         return []
@@ -270,6 +434,22 @@ def scan_can_devices(
     return parse_can_query_output(result.stdout)
 
 
+def _socket_query(interface: str, listen: float) -> Optional[list[DiscoveredCanDevice]]:
+    """One direct SocketCAN admin query; None if the bus cannot be used."""
+    try:
+        with _canbus.open_admin_socket(interface) as sock:
+            return _canbus.query(sock, listen)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _flashtool_path(katapult_dir: str) -> Optional[str]:
+    """Resolved Katapult flashtool.py path, or None if it is not installed."""
+    flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
+    return str(flashtool) if flashtool.exists() else None
+
+
 def get_can_interface_qlen(interface: str) -> int | None:
     """Read CAN interface transmit queue length from sysfs.
 
@@ -289,9 +469,16 @@ def preflight_can_interface(interface: str) -> tuple[bool, str]:
     Validates: interface exists, is UP, has qlen >= MINIMUM_CAN_QLEN.
     Returns (ok, error_message). Empty string on success.
     """
+    # One netlink dump answers all three checks; sysfs is the fallback
+    links = _link_snapshot()
+    if links is not None:
+        available = _can_names(links)
+    else:
+        available = get_can_interfaces()
+
     # Check interface exists
-    available = get_can_interfaces()
     if interface not in available:
+        reset_caches()  # The user will plug in / bring up an adapter and retry
         avail_str = ", ".join(available) if available else "none"
         return False, (
             f"CAN interface '{interface}' not found. "
@@ -299,16 +486,17 @@ def preflight_can_interface(interface: str) -> tuple[bool, str]:
             "1. Check USB-to-CAN adapter is connected\n"
             "2. Run: sudo ip link set can0 up type can bitrate 1000000"
         )
+    link = links[interface] if links is not None else _sysfs_link(interface)
 
     # Check interface is UP
-    if not is_can_interface_up(interface):
+    if not link.is_up:
         return False, (
             f"CAN interface '{interface}' is DOWN.\n"
             f"Run: sudo ip link set {interface} up"
         )
 
     # Check qlen (non-blocking if unreadable)
-    qlen = get_can_interface_qlen(interface)
+    qlen = link.txqlen
     if qlen is not None and qlen < MINIMUM_CAN_QLEN:
         return False, (
             f"CAN interface '{interface}' has low txqueuelen ({qlen}). "
@@ -328,23 +516,49 @@ def verify_can_device_after_flash(
 ) -> tuple[bool, str | None]:
     """Verify CAN device returned with Klipper application after flash.
 
-    Polls flashtool.py -q until the device UUID appears with
-    Application: Klipper. Returns (success, error_reason).
+    Polls the CAN admin query until the device UUID appears with
+    Application: Klipper. The query is sent directly over SocketCAN when
+    possible, falling back to polling flashtool.py -q. Returns
+    (success, error_reason).
     """
-    flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
     deadline = time.monotonic() + timeout
 
+    def _is_target(dev: DiscoveredCanDevice) -> bool:
+        return dev.uuid == uuid and dev.application == "Klipper"
+
+    # Fast path: query the bus directly, one CAN frame per poll instead of a
+    # flashtool.py interpreter start. Any socket error hands the remaining
+    # time to the flashtool loop below.
+    try:
+        sock = _canbus.open_admin_socket(interface)
+    except OSError:
+        sock = None
+    if sock is not None:
+        with sock:
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    listen = min(poll_interval, remaining)
+                    if any(_is_target(dev) for dev in _canbus.query(sock, listen, _is_target)):
+                        return True, None
+            except OSError:
+                pass
+
+    flashtool = _flashtool_path(katapult_dir) or str(
+        Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
+    )
     while time.monotonic() < deadline:
         try:
             result = runner.run(
-                ["python3", str(flashtool), "-i", interface, "-q"],
+                ["python3", flashtool, "-i", interface, "-q"],
                 timeout=10,
+                text=False,
             )
             if result.returncode == 0:
-                devices = parse_can_query_output(result.stdout)
-                for dev in devices:
-                    if dev.uuid == uuid and dev.application == "Klipper":
-                        return True, None
+                if any(_is_target(dev) for dev in parse_can_query_output(result.stdout)):
+                    return True, None
         except OSError:
             pass
         time.sleep(poll_interval)
@@ -394,8 +608,7 @@ def wait_for_device(
         found_katapult = False
 
         for device in devices:
-            variants = prefix_variants(serial_pattern)
-            if any(fnmatch.fnmatch(device.filename, v) for v in variants):
+            if pattern_matches(serial_pattern, device.filename):
                 filename_lower = device.filename.lower()
                 if filename_lower.startswith("usb-klipper_"):
                     em.progress("Verify", "\n")
@@ -2,7 +2,40 @@
 
 from __future__ import annotations
 
-import textwrap
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import textwrap
+
+
+@functools.lru_cache(maxsize=1)
+def _wrapper() -> textwrap.TextWrapper:
+    """Shared wrapper for format_error (same settings as textwrap.fill(width=80)).
+
+    Built once, on the first formatted error; textwrap is imported lazily since
+    every module imports errors but most runs never format one.
+    """
+    import textwrap
+
+    return textwrap.TextWrapper(width=80)
+
+
+def _fill(line: str) -> str:
+    """``_wrapper().fill(line)``, skipping the wrapper for lines it would not change.
+
+    A line of at most 80 columns with no tabs/control whitespace and no
+    trailing space comes back from fill() untouched, which covers nearly
+    every template recovery line.
+    """
+    if len(line) <= 80 and line.isprintable() and not line.endswith(" "):
+        return line
+    return _wrapper().fill(line)
+
+
+# Context keys rendered first, in this order, with their display labels
+_CONTEXT_LABELS = (("device", "device"), ("mcu", "MCU"), ("path", "path"))
+_HANDLED_KEYS = frozenset(key for key, _ in _CONTEXT_LABELS) | {"expected", "actual"}
 
 
 def format_error(
@@ -30,33 +63,29 @@ def format_error(
 
     if context:
         # Build context prose from key-value pairs
-        context_parts = []
-        if "device" in context:
-            context_parts.append(f"device '{context['device']}'")
-        if "mcu" in context:
-            context_parts.append(f"MCU '{context['mcu']}'")
-        if "path" in context:
-            context_parts.append(f"path '{context['path']}'")
+        context_parts = [
+            f"{label} '{context[key]}'" for key, label in _CONTEXT_LABELS if key in context
+        ]
         if "expected" in context and "actual" in context:
             context_parts.append(
                 f"expected '{context['expected']}' but found '{context['actual']}'"
             )
         # Include any other keys not explicitly handled
         for key, value in context.items():
-            if key not in ("device", "mcu", "path", "expected", "actual"):
+            if key not in _HANDLED_KEYS:
                 context_parts.append(f"{key} '{value}'")
 
         if context_parts:
             context_prose = "Affected: " + ", ".join(context_parts) + "."
             lines.append("")
-            lines.append(textwrap.fill(context_prose, width=80))
+            lines.append(_fill(context_prose))
 
     if recovery:
         lines.append("")
         # Preserve newlines in numbered lists: wrap each line individually
         for line in recovery.split("\n"):
             if line.strip():
-                lines.append(textwrap.fill(line, width=80))
+                lines.append(_fill(line))
             else:
                 lines.append("")  # Preserve blank lines
 
@@ -218,6 +247,9 @@ def get_recovery_text(template_key: str) -> str:
 class KlipperFlashError(Exception):
     """Base for all kalico-flash errors."""
 
+    # Subclasses with fields declare slots so instances never grow a __dict__
+    __slots__ = ()
+
 
 class RegistryError(KlipperFlashError):
     """Registry file errors: corrupt JSON, missing fields, duplicate keys."""
@@ -226,6 +258,8 @@ class RegistryError(KlipperFlashError):
 class DeviceNotFoundError(KlipperFlashError):
     """Named device not in registry or not physically connected."""
 
+    __slots__ = ("identifier", "connected")
+
     def __init__(self, identifier: str, *, connected: bool = False):
         super().__init__(f"Device not found: {identifier}")
         self.identifier = identifier
@@ -255,6 +289,8 @@ class FlashError(KlipperFlashError):
 class ConfigMismatchError(KlipperFlashError):
     """Cached config MCU does not match registered device MCU."""
 
+    __slots__ = ("expected_mcu", "actual_mcu", "device_key")
+
     def __init__(self, expected_mcu: str, actual_mcu: str, device_key: str):
         super().__init__(
             f"MCU mismatch for {device_key}: expected {expected_mcu}, got {actual_mcu}"
@@ -267,6 +303,8 @@ class ConfigMismatchError(KlipperFlashError):
 class ExcludedDeviceError(KlipperFlashError):
     """Device is marked as non-flashable (excluded from flashing)."""
 
+    __slots__ = ("device_key",)
+
     def __init__(self, device_key: str):
         super().__init__(f"Device '{device_key}' is excluded from flashing")
         self.device_key = device_key
@@ -21,12 +21,15 @@ from __future__ import annotations
 
 import dataclasses
 import enum
+import itertools
+import re
 from dataclasses import dataclass
 from pathlib import Path
 from subprocess import TimeoutExpired
 from typing import Optional
 
-from . import runner
+from . import ccache, runner
+from .boards import fragment_drift
 from .bootloader import enter_bootloader
 from .build import run_menuconfig
 from .ccache import is_ccache_available
@@ -166,7 +169,6 @@ def _warn_fragment_drift(
     """
     if not seed_fragment:
         return
-    from .boards import fragment_drift  # late import: avoids boards<->config cycle
 
     try:
         final = config_mgr.cache_path.read_text(encoding="utf-8").splitlines()
@@ -339,6 +341,15 @@ def load_and_validate_config(
 # ---------------------------------------------------------------------------
 
 
+# Moonraker keys each MCU twice: by object name ("nhk") and by chip type
+# ("rp2040"). Only the chip-type aliases contain digits.
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _is_chip_alias(mcu_name: str) -> bool:
+    return _DIGIT_RE.search(mcu_name) is not None
+
+
 def resolve_target_mcu_version(
     entry: DeviceEntry, mcu_versions: dict
 ) -> Optional[str]:
@@ -361,35 +372,28 @@ def resolve_target_mcu_version(
             lookup = entry.mcu_name[4:]
         else:
             lookup = entry.mcu_name
+        if lookup in mcu_versions:
+            return lookup
         lookup_lower = lookup.lower()
         for mcu_name in mcu_versions:
             if mcu_name.lower() == lookup_lower:
                 return mcu_name
         return None
 
-    friendly = [n for n in mcu_versions if not any(c.isdigit() for c in n)]
-    chip_keys = [n for n in mcu_versions if any(c.isdigit() for c in n)]
-    target_mcu: Optional[str] = None
-    for candidate in (entry.name, entry.key):
-        if not candidate:
-            continue
-        cl = candidate.lower()
-        for mcu_name in friendly:
-            nl = mcu_name.lower()
-            if nl == cl or nl in cl or cl in nl:
-                target_mcu = mcu_name
-                break
-        if target_mcu:
-            break
-    if target_mcu is None:
-        for mcu_name in friendly + chip_keys:
-            if (
-                entry.mcu.lower() in mcu_name.lower()
-                or mcu_name.lower() in entry.mcu.lower()
-            ):
-                target_mcu = mcu_name
-                break
-    return target_mcu
+    # Lowercase each MCU name once; both passes below probe the same table
+    friendly: list[tuple[str, str]] = []
+    chip_keys: list[tuple[str, str]] = []
+    for n in mcu_versions:
+        (chip_keys if _is_chip_alias(n) else friendly).append((n, n.lower()))
+    for cl in [c.lower() for c in (entry.name, entry.key) if c]:
+        for mcu_name, nl in friendly:
+            if nl in cl or cl in nl:
+                return mcu_name
+    mcu_lower = entry.mcu.lower()
+    for mcu_name, nl in itertools.chain(friendly, chip_keys):
+        if mcu_lower in nl or nl in mcu_lower:
+            return mcu_name
+    return None
 
 
 def emit_host_and_mcu_versions(
@@ -401,22 +405,21 @@ def emit_host_and_mcu_versions(
     """Emit the host banner and the per-MCU ``[*]`` listing (single path)."""
     em.phase("Version", f"Host: {detect_firmware_flavor(host_version)} {host_version}")
 
-    # Build set of friendly names (no digits = not a chip-type alias)
-    friendly_names = {n for n in mcu_versions if not any(c.isdigit() for c in n)}
+    # Friendly names only (no digits = not a chip-type alias); the aliases are
+    # for matching, not display, so they are dropped before sorting
+    friendly_names = sorted(n for n in mcu_versions if not _is_chip_alias(n))
     # If target matched a chip-type alias, find the friendly name with the same
     # version so we can mark it with [*].
     display_target = target_mcu
-    if target_mcu and target_mcu not in friendly_names:
+    if target_mcu and _is_chip_alias(target_mcu):
         target_ver = mcu_versions[target_mcu]
         for fn in friendly_names:
             if mcu_versions[fn] == target_ver:
                 display_target = fn
                 break
 
-    for mcu_name, mcu_version in sorted(mcu_versions.items()):
-        # Skip chip-type aliases (added for matching, not display).
-        if mcu_name not in friendly_names:
-            continue
+    for mcu_name in friendly_names:
+        mcu_version = mcu_versions[mcu_name]
         marker = "*" if mcu_name == display_target else " "
         em.phase("Version", f"  [{marker}] MCU {mcu_name}: {mcu_version}")
 
@@ -447,6 +450,8 @@ def _run_ccache_install(em: Emitter) -> bool:
         return False
 
     if returncode == 0:
+        # Drop the memoized "not on PATH" answer from before the install.
+        ccache.reset_caches()
         em.success("ccache installed successfully")
         return True
     em.error(f"apt install failed with exit code {returncode}")
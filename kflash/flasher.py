@@ -11,16 +11,17 @@ Public API (Phase 45+):
 
 from __future__ import annotations
 
-import fnmatch
+import getpass
 import os
 import re
+import shutil
 import time
 from pathlib import Path
 from typing import Callable, Optional
 
 from . import runner
 from .bootloader import get_klippy_env_python
-from .discovery import prefix_variants
+from .discovery import pattern_matches
 from .errors import DiscoveryError, format_error
 from .events import Emitter, NullSink
 from .models import DeviceEntry, FlashResult, GlobalConfig, KatapultCheckResult
@@ -146,9 +147,8 @@ def _poll_for_serial_device(
     deadline = time.monotonic() + timeout
     while time.monotonic() < deadline:
         try:
-            variants = prefix_variants(pattern)
             for name in os.listdir(serial_dir):
-                if any(fnmatch.fnmatch(name, v) for v in variants):
+                if pattern_matches(pattern, name):
                     return os.path.join(serial_dir, name)
         except FileNotFoundError:
             pass  # Directory may vanish briefly during USB reset
@@ -574,8 +574,6 @@ def flash_uf2(
     """
     if em is None:
         em = Emitter(NullSink())
-    import getpass
-    import shutil
 
     start = time.monotonic()
     username = getpass.getuser()
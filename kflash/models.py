@@ -64,6 +64,10 @@ class BlockedDevice:
 class DiscoveredDevice:
     """A USB serial device found during scanning."""
 
+    # Built for every by-id entry on each scan; slots keep instances dict-free.
+    # (Spelled out by hand: dataclass(slots=True) needs Python 3.10.)
+    __slots__ = ("path", "filename")
+
     path: str  # "/dev/serial/by-id/usb-Klipper_stm32h723xx_..."
     filename: str  # "usb-Klipper_stm32h723xx_29001A001151313531383332-if00"
 
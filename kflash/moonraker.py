@@ -13,6 +13,7 @@ Endpoints used:
 from __future__ import annotations
 
 import fnmatch
+import functools
 import json
 import re
 from pathlib import Path
@@ -29,8 +30,12 @@ MOONRAKER_URL = "http://localhost:7125"
 TIMEOUT = 5  # seconds
 
 
+@functools.lru_cache(maxsize=16)
 def detect_firmware_flavor(version: Optional[str]) -> str:
-    """Return 'Kalico' or 'Klipper' based on version string format."""
+    """Return 'Kalico' or 'Klipper' based on version string format.
+
+    Memoized: a flash labels the same host/MCU version strings several times.
+    """
     if not version:
         return "Unknown"
     # Kalico uses date-based tags: v2025.xx, v2026.xx, etc.
@@ -412,6 +417,8 @@ def get_mcu_version_for_device(
 
     # Case-insensitive lookup: Moonraker configfile returns lowercase keys,
     # but object names preserve case from printer.cfg (e.g., "hbb" vs "HBB")
+    if lookup_key in versions:
+        return versions[lookup_key]
     lookup_lower = lookup_key.lower()
     for key, value in versions.items():
         if key.lower() == lookup_lower:
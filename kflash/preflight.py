@@ -9,7 +9,10 @@ Moved verbatim out of ``flash.py`` (Phase 2 Step B) with public names.
 
 from __future__ import annotations
 
+import functools
+import os
 import shutil
+import stat
 from pathlib import Path
 from typing import Optional
 
@@ -28,12 +31,29 @@ from .validation import (
 SUSPICIOUS_FIRMWARE_SIZE_BYTES = 16 * 1024
 
 
+@functools.lru_cache(maxsize=32)
+def _which(name: str) -> Optional[str]:
+    """``shutil.which`` memoized per process.
+
+    Every build/flash preflights the same handful of tools, and each lookup
+    stats every PATH entry. A failed preflight clears the cache (see
+    :func:`reset_caches`) so a tool installed before the retry is found.
+    """
+    return shutil.which(name)
+
+
+def reset_caches() -> None:
+    """Forget memoized tool lookups (tests, or after installing a tool)."""
+    _which.cache_clear()
+
+
 def emit_preflight(em: Emitter, errors: list[str], warnings: list[str]) -> bool:
     """Emit preflight warnings/errors. Returns True if no errors."""
     for warning in warnings:
         em.warn(f"Preflight: {warning}")
 
     if errors:
+        reset_caches()  # The user will install what is missing and retry
         em.error("Preflight checks failed:")
         for err in errors:
             em.error(f"  - {err}")
@@ -54,10 +74,17 @@ def check_firmware_artifact(
         return ("build returned no firmware path", None)
 
     path = Path(firmware_path)
-    if not path.is_file():
-        return (f"firmware file not found: {path}", None)
-
-    size = firmware_size if firmware_size is not None else path.stat().st_size
+    if firmware_size is not None:
+        # run_build stat()ed the image it just produced; no need to again
+        size = firmware_size
+    else:
+        try:
+            st = path.stat()
+        except OSError:
+            return (f"firmware file not found: {path}", None)
+        if not stat.S_ISREG(st.st_mode):
+            return (f"firmware file not found: {path}", None)
+        size = st.st_size
     if size <= 0:
         return (f"firmware file is empty: {path}", None)
 
@@ -75,18 +102,22 @@ def check_firmware_artifact(
 
 def preflight_build(em: Emitter, klipper_dir: str) -> bool:
     """Validate build prerequisites and Klipper directory."""
+    return _preflight_build(em, os.path.expanduser(klipper_dir))
+
+
+def _preflight_build(em: Emitter, klipper_path: str) -> bool:
+    """preflight_build on an already-expanded Klipper path."""
     errors: list[str] = []
     warnings: list[str] = []
 
-    klipper_path = Path(klipper_dir).expanduser()
-    if not klipper_path.is_dir():
+    if not os.path.isdir(klipper_path):
         errors.append(f"Klipper directory not found: {klipper_path}")
-    elif not (klipper_path / "Makefile").is_file():
+    elif not os.path.isfile(os.path.join(klipper_path, "Makefile")):
         errors.append(f"Klipper Makefile not found in: {klipper_path}")
 
-    if shutil.which("make") is None:
+    if _which("make") is None:
         errors.append("`make` not found in PATH")
-    if shutil.which("arm-none-eabi-gcc") is None:
+    if _which("arm-none-eabi-gcc") is None:
         errors.append(
             "`arm-none-eabi-gcc` not found in PATH "
             "(install: sudo apt install gcc-arm-none-eabi)"
@@ -102,7 +133,8 @@ def preflight_flash(
     flash_command: str,
 ) -> bool:
     """Validate flash prerequisites for the selected flash command."""
-    if not preflight_build(em, klipper_dir):
+    klipper_path = os.path.expanduser(klipper_dir)
+    if not _preflight_build(em, klipper_path):
         return False
 
     errors: list[str] = []
@@ -116,28 +148,22 @@ def preflight_flash(
         errors.append(f"Unknown flash command: {method}")
         return emit_preflight(em, errors, warnings)
 
-    if method == "katapult":
-        flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-        if not flashtool.is_file():
-            errors.append(f"Katapult flashtool not found at {flashtool}")
-        if shutil.which("python3") is None:
-            errors.append("`python3` not found in PATH (required for Katapult)")
-
-    if method == "katapult_can":
-        flashtool = Path(katapult_dir).expanduser() / "scripts" / "flashtool.py"
-        if not flashtool.is_file():
+    if method in ("katapult", "katapult_can"):
+        flashtool = os.path.join(os.path.expanduser(katapult_dir), "scripts", "flashtool.py")
+        if not os.path.isfile(flashtool):
             errors.append(f"Katapult flashtool not found at {flashtool}")
-        if shutil.which("python3") is None:
-            errors.append("`python3` not found in PATH (required for CAN flash)")
+        if _which("python3") is None:
+            purpose = "Katapult" if method == "katapult" else "CAN flash"
+            errors.append(f"`python3` not found in PATH (required for {purpose})")
 
     if method == "flash_sdcard":
-        script = Path(klipper_dir).expanduser() / "scripts" / "flash-sdcard.sh"
-        if not script.is_file():
+        script = os.path.join(klipper_path, "scripts", "flash-sdcard.sh")
+        if not os.path.isfile(script):
             errors.append(f"flash-sdcard.sh not found at {script}")
 
-    if shutil.which("sudo") is None:
+    if _which("sudo") is None:
         warnings.append("`sudo` not found; Klipper service control may fail")
-    if shutil.which("systemctl") is None:
+    if _which("systemctl") is None:
         warnings.append("`systemctl` not found; Klipper service control may fail")
 
     return emit_preflight(em, errors, warnings)
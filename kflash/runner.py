@@ -3,12 +3,14 @@
 Every external command is one of three shapes:
 
 * captured text (``run``): ``capture_output=True, text=True``, output
-  available only after the process exits;
+  available only after the process exits (``capture=False`` sends it to
+  ``/dev/null`` instead, for callers that only need the exit status);
 * interactive TTY (``run_interactive``): inherited stdin/stdout/stderr, for
   menuconfig's ncurses UI;
 * live line-streamed (``run_streaming_lines``): captured stdout/stderr piped
   and delivered line-by-line to an ``on_line`` callback as they arrive, for
-  build/flash output relayed through the engine event stream.
+  build/flash output relayed through the engine event stream. ``max_lines``
+  bounds how much of that output is kept for the returned result.
 
 The single sanctioned ``subprocess.Popen`` in the codebase lives inside
 ``run_streaming_lines`` -- it is needed to stream output line-by-line while
@@ -28,6 +30,7 @@ import queue
 import subprocess
 import threading
 import time
+from collections import deque
 from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from typing import Callable, Optional, Protocol
@@ -68,6 +71,7 @@ class Runner(Protocol):
         env: Optional[Mapping[str, str]] = None,
         input: Optional[str] = None,
         text: bool = True,
+        capture: bool = True,
     ) -> CommandResult: ...
 
     def run_interactive(
@@ -87,6 +91,7 @@ class Runner(Protocol):
         cwd: Optional[str] = None,
         env: Optional[Mapping[str, str]] = None,
         on_line: Callable[[str], None],
+        max_lines: Optional[int] = None,
     ) -> CommandResult: ...
 
 
@@ -113,11 +118,15 @@ class SubprocessRunner:
         env: Optional[Mapping[str, str]] = None,
         input: Optional[str] = None,
         text: bool = True,
+        capture: bool = True,
     ) -> CommandResult:
+        # Without capture, output goes to /dev/null: no pipes, no decode.
+        sink = subprocess.PIPE if capture else subprocess.DEVNULL
         try:
             proc = subprocess.run(
                 list(argv),
-                capture_output=True,
+                stdout=sink,
+                stderr=sink,
                 text=text,
                 timeout=timeout,
                 cwd=cwd,
@@ -160,6 +169,7 @@ class SubprocessRunner:
         cwd: Optional[str] = None,
         env: Optional[Mapping[str, str]] = None,
         on_line: Callable[[str], None],
+        max_lines: Optional[int] = None,
     ) -> CommandResult:
         proc = subprocess.Popen(
             list(argv),
@@ -188,7 +198,9 @@ class SubprocessRunner:
         reader_thread = threading.Thread(target=_reader, daemon=True)
         reader_thread.start()
 
-        collected: list[str] = []
+        # deque(maxlen=None) is unbounded; a bound keeps only the tail so a
+        # chatty process (a full firmware build) is never held in memory.
+        collected: deque[str] = deque(maxlen=max_lines)
         deadline = time.monotonic() + timeout
         eof_seen = False
         try:
@@ -269,9 +281,10 @@ def run(
     env: Optional[Mapping[str, str]] = None,
     input: Optional[str] = None,
     text: bool = True,
+    capture: bool = True,
 ) -> CommandResult:
     return _active.run(
-        argv, timeout=timeout, cwd=cwd, env=env, input=input, text=text
+        argv, timeout=timeout, cwd=cwd, env=env, input=input, text=text, capture=capture
     )
 
 
@@ -292,7 +305,8 @@ def run_streaming_lines(
     cwd: Optional[str] = None,
     env: Optional[Mapping[str, str]] = None,
     on_line: Callable[[str], None],
+    max_lines: Optional[int] = None,
 ) -> CommandResult:
     return _active.run_streaming_lines(
-        argv, timeout=timeout, cwd=cwd, env=env, on_line=on_line
+        argv, timeout=timeout, cwd=cwd, env=env, on_line=on_line, max_lines=max_lines
     )
@@ -36,6 +36,19 @@ def _restore_active_runner():
         runner.set_runner(original)
 
 
+@pytest.fixture(autouse=True)
+def _reset_engine_caches():
+    """Clear module-level memoization so cached filesystem probes made against
+    one test's ``tmp_path`` never answer for another test."""
+    from kflash import bootloader, ccache, discovery, preflight
+
+    bootloader.reset_caches()
+    ccache.reset_caches()
+    discovery.reset_caches()
+    preflight.reset_caches()
+    yield
+
+
 class FakeRegistry:
     """Minimal registry stand-in exposing only ``.get(key)``.
 
@@ -99,7 +112,7 @@ class FakeRunner:
             total += 1
         return total
 
-    def run(self, argv, *, timeout, cwd=None, env=None, input=None, text=True):
+    def run(self, argv, *, timeout, cwd=None, env=None, input=None, text=True, capture=True):
         self.calls.append(("run", tuple(str(a) for a in argv)))
         return self._result(argv)
 
@@ -107,7 +120,9 @@ class FakeRunner:
         self.calls.append(("interactive", tuple(str(a) for a in argv)))
         return self._result(argv).returncode
 
-    def run_streaming_lines(self, argv, *, timeout, cwd=None, env=None, on_line):
+    def run_streaming_lines(
+        self, argv, *, timeout, cwd=None, env=None, on_line, max_lines=None
+    ):
         self.calls.append(("stream_lines", tuple(str(a) for a in argv)))
         tokens = [str(a) for a in argv]
         for token, lines in self.line_rules:
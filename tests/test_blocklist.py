@@ -0,0 +1,105 @@
+"""Tier-1 tests for kflash.blocklist: default + user block patterns.
+
+Patterns are matched case-insensitively after normalization; registered
+entries are checked in both directions (block glob vs registered glob).
+"""
+
+from __future__ import annotations
+
+from kflash import blocklist
+from kflash.models import BlockedDevice, DeviceEntry, RegistryData
+
+BEACON = "usb-Beacon_Beacon_RevH_FC2A6E-if00"
+KLIPPER_H723 = "usb-Klipper_stm32h723xx_29001A001151-if00"
+
+
+def _blocked(*patterns):
+    data = RegistryData(blocked_devices=[BlockedDevice(p, r) for p, r in patterns])
+    return blocklist.build_blocked_list(data)
+
+
+def _entry(serial_pattern):
+    return DeviceEntry(key="k", name="K", mcu="stm32h723", serial_pattern=serial_pattern)
+
+
+def test_default_blocklist_catches_beacon():
+    assert blocklist.blocked_reason_for_filename(BEACON, _blocked()) == (
+        "Beacon probe (not a Klipper MCU)"
+    )
+    assert blocklist.blocked_reason_for_filename(KLIPPER_H723, _blocked()) is None
+
+
+def test_user_pattern_is_normalized_and_case_insensitive():
+    blocked = _blocked(("  USB-Klipper_STM32H723*  ", None))
+    assert blocklist.blocked_reason_for_filename(KLIPPER_H723, blocked) == "Blocked by policy"
+
+
+def test_entry_matches_in_both_directions():
+    blocked = _blocked(("usb-klipper_stm32h723xx_29001a001151-if00", "exact"))
+    # Registered glob covers the blocked literal
+    assert blocklist.blocked_reason_for_entry(_entry("usb-Klipper_stm32h723xx_*"), blocked) == (
+        "exact"
+    )
+    # Blocked glob covers the registered literal
+    assert blocklist.blocked_reason_for_entry(_entry(BEACON), _blocked()) == (
+        "Beacon probe (not a Klipper MCU)"
+    )
+
+
+def test_entry_unsupported_and_can_entries():
+    assert blocklist.blocked_reason_for_entry(_entry("usb-Foo_bar*"), _blocked()) == (
+        "Unsupported USB device"
+    )
+    assert blocklist.blocked_reason_for_entry(_entry(None), _blocked()) is None
+
+
+def test_first_matching_pattern_reports_its_reason():
+    blocked = _blocked(("usb-klipper_*h723*-if00", "multi-star"), ("usb-klipper_*", "broad"))
+    assert blocklist.blocked_reason_for_filename(KLIPPER_H723, blocked) == "multi-star"
+    rp2040 = "usb-Klipper_rp2040_E66160F423-if00"
+    assert blocklist.blocked_reason_for_filename(rp2040, blocked) == "broad"
+
+
+def test_prefix_and_glob_tiers_keep_list_order():
+    blocked = _blocked(
+        ("usb-klipper_stm32h723xx_2900?a*", "glob first"),
+        ("usb-klipper_*", "prefix second"),
+        ("usb-klipper_rp2040_*", "prefix third"),
+    )
+    assert blocklist.blocked_reason_for_filename(KLIPPER_H723, blocked) == "glob first"
+    rp2040 = "usb-Klipper_rp2040_E66160F423-if00"
+    assert blocklist.blocked_reason_for_filename(rp2040, blocked) == "prefix second"
+    prefixes, indices, union = blocklist._blocked_matcher(
+        tuple(pattern for pattern, _reason in blocked)
+    )
+    assert prefixes == ("usb-beacon_", "usb-klipper_", "usb-klipper_rp2040_")
+    assert indices == (0, 2, 3)
+    assert union is not None and union.groupindex.keys() == {"b1"}
+
+
+def test_entry_answer_follows_blocklist_changes():
+    entry = _entry("usb-Klipper_stm32h723xx_29001A*")
+    assert blocklist.blocked_reason_for_entry(entry, _blocked()) is None
+    blocked = _blocked(("usb-klipper_stm32h723xx_*", "retired"))
+    assert blocklist.blocked_reason_for_entry(entry, blocked) == "retired"
+
+
+def test_multi_star_user_patterns_map_back_to_their_reasons():
+    # fnmatch.translate emits its own named groups for multi-star globs on
+    # 3.9/3.10; they must coexist with the b<i> wrappers in one alternation.
+    blocked = _blocked(
+        ("usb-klipper_*h723*-if00", "h723"),
+        ("usb-klipper_*rp2040*-if0?", "rp2040"),
+        ("usb-*_*stm32f446*", "f446"),
+    )
+    assert blocklist.blocked_reason_for_filename(KLIPPER_H723, blocked) == "h723"
+    rp2040 = "usb-Klipper_rp2040_E66160F423-if00"
+    assert blocklist.blocked_reason_for_filename(rp2040, blocked) == "rp2040"
+    f446 = "usb-Klipper_stm32f446xx_0E002A-if00"
+    assert blocklist.blocked_reason_for_filename(f446, blocked) == "f446"
+    lpc = "usb-Klipper_lpc1769_1A2B-if00"
+    assert blocklist.blocked_reason_for_filename(lpc, blocked) is None
+    _prefixes, _indices, union = blocklist._blocked_matcher(
+        tuple(pattern for pattern, _reason in blocked)
+    )
+    assert union is not None and {"b1", "b2", "b3"} <= union.groupindex.keys()
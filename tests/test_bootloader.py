@@ -0,0 +1,248 @@
+"""Tier-1 tests for kflash.bootloader signature parsing and re-enumeration.
+
+``_poll_for_reenumeration`` takes an injectable ``scan_fn`` and an
+``interval`` of 0.0, so both phases run against scripted directory listings
+without touching ``/dev`` or sleeping.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+import pytest
+from conftest import FakeRunner
+
+from kflash import bootloader as b
+from kflash import runner
+from kflash.models import DeviceEntry
+from kflash.runner import CommandResult
+
+KLIPPER_H723 = "usb-Klipper_stm32h723xx_29001A001151-if00"
+KATAPULT_H723 = "usb-katapult_stm32h723xx_29001A001151-if00"
+OTHER_H723 = "usb-katapult_stm32h723xx_FFFF00001151-if00"
+BEACON = "usb-Beacon_Beacon_RevH_FC2A6E-if00"
+
+
+def _scripted(*listings):
+    """Return a scan_fn yielding each listing in turn, repeating the last."""
+    calls = []
+
+    def scan_fn():
+        idx = min(len(calls), len(listings) - 1)
+        calls.append(idx)
+        return list(listings[idx])
+
+    scan_fn.calls = calls
+    return scan_fn
+
+
+def test_extract_device_signature_klipper_and_katapult_agree():
+    assert b.extract_device_signature(KLIPPER_H723) == ("stm32h723xx", "29001A001151")
+    assert b.extract_device_signature(KATAPULT_H723) == b.extract_device_signature(
+        KLIPPER_H723
+    )
+
+
+def test_extract_device_signature_non_klipper_is_none():
+    assert b.extract_device_signature(BEACON) is None
+
+
+def test_poll_finds_prefix_flipped_device():
+    scan = _scripted([KLIPPER_H723, BEACON], [BEACON], [BEACON, OTHER_H723, KATAPULT_H723])
+    path = b._poll_for_reenumeration(
+        f"{b.SERIAL_DIR}/{KLIPPER_H723}", None, timeout=5.0, interval=0.0, scan_fn=scan
+    )
+    assert path == f"{b.SERIAL_DIR}/{KATAPULT_H723}"
+
+
+def test_poll_ignores_same_mcu_with_different_serial():
+    scan = _scripted([KLIPPER_H723], [OTHER_H723])
+    path = b._poll_for_reenumeration(
+        f"{b.SERIAL_DIR}/{KLIPPER_H723}", None, timeout=0.05, interval=0.0, scan_fn=scan
+    )
+    assert path is None
+
+
+def test_poll_times_out_when_device_never_disappears():
+    scan = _scripted([KLIPPER_H723])
+    path = b._poll_for_reenumeration(
+        f"{b.SERIAL_DIR}/{KLIPPER_H723}", None, timeout=0.05, interval=0.0, scan_fn=scan
+    )
+    assert path is None
+    assert scan.calls  # phase 1 actually polled
+
+
+def test_serial_dir_watcher_wakes_early_on_create(tmp_path):
+    watcher = b._SerialDirWatcher(str(tmp_path))
+    try:
+        if watcher._epoll is None:
+            pytest.skip("inotify unavailable on this platform")
+        timer = threading.Timer(0.05, (tmp_path / KATAPULT_H723).touch)
+        timer.start()
+        start = time.monotonic()
+        watcher.wait(5.0)
+        timer.join()
+        assert time.monotonic() - start < 2.0
+    finally:
+        watcher.close()
+
+
+def test_serial_dir_watcher_missing_dir_falls_back_to_sleep(tmp_path):
+    watcher = b._SerialDirWatcher(str(tmp_path / "missing"))
+    assert watcher._epoll is None
+    start = time.monotonic()
+    watcher.wait(0.02)
+    assert time.monotonic() - start >= 0.02
+    watcher.close()
+
+
+def test_load_flash_usb_by_path_leaves_sys_path_alone(tmp_path):
+    (tmp_path / "flash_usb.py").write_text(
+        "import sys\n"
+        "CALLS = []\n"
+        "def enter_bootloader(device):\n"
+        "    sys.stderr.write('Entering bootloader on %s\\n' % device)\n"
+        "    CALLS.append(device)\n"
+    )
+    before = list(sys.path)
+    enter = b._load_flash_usb(str(tmp_path))
+    assert enter is not None
+    assert sys.path == before
+    assert b._call_with_timeout(enter, "/dev/ttyACM0", 1.0)
+    assert enter.__globals__["CALLS"] == ["/dev/ttyACM0"]
+
+
+def test_sibling_venv_sharing_base_python_is_not_current(monkeypatch, tmp_path):
+    base = tmp_path / "usr" / "bin" / "python3"
+    base.parent.mkdir(parents=True)
+    base.touch(mode=0o755)
+    for env in ("klippy-env", "kflash-env"):
+        (tmp_path / env / "bin").mkdir(parents=True)
+        (tmp_path / env / "bin" / "python3").symlink_to(base)
+    monkeypatch.setattr(b.sys, "prefix", str(tmp_path / "kflash-env"))
+
+    assert not b._is_current_interpreter(str(tmp_path / "klippy-env" / "bin" / "python3"))
+    assert b._is_current_interpreter(str(tmp_path / "kflash-env" / "bin" / "python3"))
+
+
+def test_load_flash_usb_missing_script_is_none(tmp_path):
+    assert b._load_flash_usb(str(tmp_path)) is None
+
+
+def test_call_with_timeout_reports_hang():
+    release = threading.Event()
+    assert not b._call_with_timeout(lambda _dev: release.wait(5.0), "/dev/x", 0.05)
+    release.set()
+
+
+def test_klippy_env_python_memoized_until_reset(tmp_path):
+    klipper = tmp_path / "klipper"
+    klipper.mkdir()
+    assert b.get_klippy_env_python(str(klipper)) == "python3"
+
+    venv_python = tmp_path / "klippy-env" / "bin" / "python3"
+    venv_python.parent.mkdir(parents=True)
+    venv_python.touch()
+    assert b.get_klippy_env_python(str(klipper)) == "python3"  # cached
+
+    b.reset_caches()
+    assert b.get_klippy_env_python(str(klipper)) == str(venv_python)
+
+
+def test_poll_cadence_does_not_drift_with_scan_time():
+    stamps = []
+
+    def slow_scan():
+        stamps.append(time.monotonic())
+        time.sleep(0.03)  # scan work shorter than the interval
+        return [KLIPPER_H723]
+
+    b._poll_for_reenumeration(
+        f"{b.SERIAL_DIR}/{KLIPPER_H723}", None, timeout=0.45, interval=0.1, scan_fn=slow_scan
+    )
+    # Ticks stay anchored at start + k*interval rather than k*(interval+work).
+    assert len(stamps) >= 4
+    assert stamps[3] - stamps[0] < 0.3 + 0.06
+
+
+class _ResettingRunner(FakeRunner):
+    """FakeRunner whose bootloader helper 're-enumerates' a fake by-id dir."""
+
+    def __init__(self, serial_dir, error=None):
+        super().__init__()
+        self.serial_dir = serial_dir
+        self.error = error
+
+    def run(self, argv, **kwargs):
+        self.calls.append(("run", tuple(str(a) for a in argv)))
+        if self.error is not None:
+            raise self.error
+        (self.serial_dir / KLIPPER_H723).unlink()
+        (self.serial_dir / KATAPULT_H723).touch()
+        return CommandResult(0)
+
+
+def _serial_setup(monkeypatch, tmp_path):
+    serial_dir = tmp_path / "by-id"
+    serial_dir.mkdir()
+    (serial_dir / KLIPPER_H723).touch()
+    flashtool = tmp_path / "katapult" / "scripts" / "flashtool.py"
+    flashtool.parent.mkdir(parents=True)
+    flashtool.touch()
+    monkeypatch.setattr(b, "SERIAL_DIR", str(serial_dir))
+    monkeypatch.setattr(b, "POLL_INTERVAL", 0.01)
+    entry = DeviceEntry(
+        key="octo",
+        name="octo",
+        mcu="stm32h723",
+        serial_pattern="usb-Klipper_stm32h723xx_octo*",
+        bootloader_method="serial",
+    )
+    return serial_dir, entry
+
+
+def test_enter_serial_polls_while_helper_runs(monkeypatch, tmp_path):
+    serial_dir, entry = _serial_setup(monkeypatch, tmp_path)
+    runner.set_runner(_ResettingRunner(serial_dir))
+    result = b.enter_bootloader(
+        device_path=str(serial_dir / KLIPPER_H723),
+        device_entry=entry,
+        klipper_dir=str(tmp_path / "klipper"),
+        katapult_dir=str(tmp_path / "katapult"),
+        stagger_delay=0.0,
+        batch=True,
+    )
+    assert result.success
+    assert result.device_path == str(serial_dir / KATAPULT_H723)
+
+
+def test_enter_serial_helper_failure_stops_polling_early(monkeypatch, tmp_path):
+    serial_dir, entry = _serial_setup(monkeypatch, tmp_path)
+    runner.set_runner(_ResettingRunner(serial_dir, error=OSError("no python")))
+    start = time.monotonic()
+    result = b.enter_bootloader(
+        device_path=str(serial_dir / KLIPPER_H723),
+        device_entry=entry,
+        klipper_dir=str(tmp_path / "klipper"),
+        katapult_dir=str(tmp_path / "katapult"),
+        stagger_delay=0.0,
+        batch=True,
+    )
+    assert not result.success
+    assert "no python" in (result.error_message or "")
+    assert time.monotonic() - start < 2.0
+
+
+def test_klippy_env_python_falls_back_to_resolved_parent(tmp_path):
+    real = tmp_path / "real"
+    (real / "klipper").mkdir(parents=True)
+    venv_python = real / "klippy-env" / "bin" / "python3"
+    venv_python.parent.mkdir(parents=True)
+    venv_python.touch()
+    link_home = tmp_path / "home"
+    link_home.mkdir()
+    (link_home / "klipper").symlink_to(real / "klipper")
+
+    assert b.get_klippy_env_python(str(link_home / "klipper")) == str(venv_python)
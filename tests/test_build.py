@@ -2,12 +2,15 @@
 
 ``run_build`` used to stream ``make`` output to inherited stdio unless a
 ``quiet=True`` flag was passed (which drew raw compiler output over the
-Textual UI). It now always captures via ``runner.run`` -- these tests pin
-that behavior and the failure-tail surfaced in ``BuildResult.error_output``.
+Textual UI). It now always captures, reading the piped output line-by-line
+into a bounded tail via ``runner.run_streaming_lines`` -- these tests pin that
+behavior and the failure-tail surfaced in ``BuildResult.error_output``.
 """
 
 from __future__ import annotations
 
+from pathlib import Path
+
 from conftest import FakeRunner
 
 from kflash import build, runner
@@ -25,10 +28,10 @@ def test_run_build_only_uses_captured_run_calls(tmp_path):
     result = build.run_build(str(klipper))
 
     assert result.success
-    # Every make invocation went through captured "run" -- never streaming.
-    assert fake.count(mode="stream_lines") == 0
-    assert fake.count(mode="run", token="clean") == 1
-    assert fake.count(mode="run") >= 2  # clean + make -jN
+    # Every make invocation was piped and captured -- never inherited stdio.
+    assert fake.count(mode="interactive") == 0
+    assert fake.count(mode="stream_lines", token="clean") == 1
+    assert fake.count(mode="stream_lines") >= 2  # clean + make -jN
 
 
 def test_run_build_failure_returns_captured_tail(tmp_path):
@@ -52,8 +55,24 @@ def test_run_build_failure_returns_captured_tail(tmp_path):
     assert result.error_output is not None
     assert "compiling foo.c" in result.error_output
     assert "foo.c:1: error: bad" in result.error_output
-    # No streaming calls were made for the failing make either.
-    assert fake.count(mode="stream_lines") == 0
+    # The failing make was captured too, not run on inherited stdio.
+    assert fake.count(mode="interactive") == 0
+
+
+def test_run_build_keeps_only_bounded_tail(tmp_path, monkeypatch):
+    seen = {}
+
+    def _stream(argv, *, timeout, cwd=None, env=None, on_line, max_lines=None):
+        seen[argv[-1]] = max_lines
+        return CommandResult(0)
+
+    monkeypatch.setattr(runner, "run_streaming_lines", _stream)
+    klipper = tmp_path / "klipper"
+    (klipper / "out").mkdir(parents=True)
+    (klipper / "out" / "klipper.bin").write_bytes(b"\x00" * 16)
+
+    assert build.run_build(str(klipper)).success
+    assert seen and all(v == build.BUILD_TAIL_LINES for v in seen.values())
 
 
 def test_run_build_has_no_quiet_parameter(tmp_path):
@@ -61,3 +80,98 @@ def test_run_build_has_no_quiet_parameter(tmp_path):
 
     sig = inspect.signature(build.run_build)
     assert "quiet" not in sig.parameters
+
+
+class _MakeRunner(FakeRunner):
+    """FakeRunner whose ``make -jN`` leaves a fresh image in ``out/``."""
+
+    def __init__(self, image="klipper.bin"):
+        super().__init__(default=CommandResult(0))
+        self.image = image
+
+    def run_streaming_lines(self, argv, *, cwd=None, **kwargs):
+        result = super().run_streaming_lines(argv, cwd=cwd, **kwargs)
+        if "clean" not in argv:
+            out = Path(cwd) / "out"
+            out.mkdir(exist_ok=True)
+            (out / self.image).write_bytes(b"\x00" * 16)
+        return result
+
+
+def test_run_build_incremental_skips_clean(tmp_path):
+    fake = _MakeRunner()
+    runner.set_runner(fake)
+
+    klipper = tmp_path / "klipper"
+    klipper.mkdir()
+
+    assert build.run_build(str(klipper), clean="never").success
+    assert fake.count(token="clean") == 0
+    assert fake.count(mode="stream_lines") == 1
+
+
+def test_run_build_incremental_drops_stale_image(tmp_path):
+    runner.set_runner(_MakeRunner(image="klipper.uf2"))
+
+    klipper = tmp_path / "klipper"
+    (klipper / "out").mkdir(parents=True)
+    (klipper / "out" / "klipper.bin").write_bytes(b"\x00" * 16)  # previous board
+
+    result = build.run_build(str(klipper), clean="never")
+    assert result.success
+    assert result.firmware_path == str(klipper / "out" / "klipper.uf2")
+
+
+def test_run_build_auto_clean_skipped_only_with_ccache(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "get_build_env", lambda use_ccache: {"PATH": "/x"})
+    monkeypatch.setattr(build, "configure_ccache", lambda: True)
+    monkeypatch.setattr(build, "statslog_offset", lambda: None)
+    monkeypatch.setattr(build, "get_ccache_stats", lambda: None)
+    fake = _MakeRunner()
+    runner.set_runner(fake)
+
+    klipper = tmp_path / "klipper"
+    klipper.mkdir()
+
+    assert build.run_build(str(klipper), use_ccache=True).success
+    assert fake.count(token="clean") == 0
+
+    assert build.run_build(str(klipper), use_ccache=True, clean="always").success
+    assert fake.count(token="clean") == 1
+
+
+def test_run_build_jobs_override_sets_job_and_load_limits(tmp_path):
+    fake = _MakeRunner()
+    runner.set_runner(fake)
+
+    klipper = tmp_path / "klipper"
+    klipper.mkdir()
+
+    assert build.run_build(str(klipper), clean="never", jobs=2).success
+    _, argv = fake.calls[-1]
+    assert argv == ("make", "-j2", "-l2", "--output-sync=recurse")
+
+
+def test_captured_tail_keeps_last_lines_across_streams():
+    result = CommandResult(
+        1,
+        stdout="".join(f"out {i}\n" for i in range(build.BUILD_TAIL_LINES)),
+        stderr="err: last",
+    )
+    tail = build._captured_tail(result)
+    assert tail is not None
+    lines = tail.splitlines()
+    assert len(lines) == build.BUILD_TAIL_LINES
+    assert lines[0] == "out 1"
+    assert lines[-1] == "err: last"
+
+
+def test_run_build_clean_failure_reports_step(tmp_path):
+    runner.set_runner(FakeRunner().when("clean", CommandResult(2, stdout="rm: denied\n")))
+    klipper = tmp_path / "klipper"
+    klipper.mkdir()
+
+    result = build.run_build(str(klipper))
+    assert not result.success
+    assert result.error_message == "make clean failed with exit code 2"
+    assert result.error_output == "rm: denied"
@@ -0,0 +1,198 @@
+"""Tests for kflash.ccache: configuration, environment and stats parsing.
+
+The ``ccache`` binary is never required: ``shutil.which`` is monkeypatched
+and every invocation goes through a FakeRunner.
+"""
+
+from __future__ import annotations
+
+import pytest
+from conftest import FakeRunner
+
+from kflash import ccache, runner
+from kflash.runner import CommandResult
+
+
+@pytest.fixture
+def have_ccache(monkeypatch):
+    monkeypatch.setattr(ccache.shutil, "which", lambda name: f"/usr/bin/{name}")
+
+
+def test_configure_ccache_sets_all_options_in_one_call(have_ccache):
+    fake = FakeRunner(default=CommandResult(0))
+    runner.set_runner(fake)
+
+    assert ccache.configure_ccache()
+
+    assert fake.count(mode="run") == 1
+    _, argv = fake.calls[0]
+    for option, value in ccache.get_ccache_config_commands():
+        assert f"{option}={value}" in argv
+    assert argv.count("--set-config") == len(ccache.get_ccache_config_commands())
+
+
+def test_configure_ccache_runs_once_per_process(have_ccache):
+    fake = FakeRunner(default=CommandResult(0))
+    runner.set_runner(fake)
+
+    assert ccache.configure_ccache()
+    assert ccache.configure_ccache()
+    assert fake.count(mode="run") == 1
+
+
+def test_configure_ccache_failure_is_retried(have_ccache):
+    fake = FakeRunner(default=CommandResult(1))
+    runner.set_runner(fake)
+
+    assert not ccache.configure_ccache()
+    assert not ccache.configure_ccache()
+    assert fake.count(mode="run") == 2
+
+
+def test_ccache_lookup_is_memoized_until_reset(monkeypatch):
+    lookups = []
+
+    def _which(name):
+        lookups.append(name)
+        return None
+
+    monkeypatch.setattr(ccache.shutil, "which", _which)
+    assert not ccache.is_ccache_available()
+    assert not ccache.setup_ccache_symlinks()
+    assert ccache.get_build_env(True) is None
+    assert lookups == ["ccache"]
+
+    ccache.reset_caches()
+    assert not ccache.is_ccache_available()
+    assert lookups == ["ccache", "ccache"]
+
+
+def test_parse_print_stats_tab_separated():
+    output = (
+        "direct_cache_hit\t12\n"
+        "preprocessed_cache_hit\t3\n"
+        "cache_miss\t5\n"
+        "cache_size_kibibyte\t2048\n"
+        "max_cache_size_kibibyte\t4096\n"
+    )
+    stats = ccache._parse_print_stats(output)
+    assert (stats.cache_hit_direct, stats.cache_hit_preprocessed, stats.cache_miss) == (
+        12,
+        3,
+        5,
+    )
+    assert stats.cache_size_bytes == 2048 * 1024
+    assert stats.cache_max_bytes == 4096 * 1024
+
+
+def test_parse_show_stats_human_readable():
+    output = (
+        "cache hit (direct)                    40\n"
+        "cache hit (preprocessed)               2\n"
+        "cache miss                             8\n"
+        "cache size                           1.5 GB\n"
+        "max cache size                       2.0 GB\n"
+    )
+    stats = ccache._parse_show_stats(output)
+    assert (stats.cache_hit_direct, stats.cache_hit_preprocessed, stats.cache_miss) == (
+        40,
+        2,
+        8,
+    )
+    assert stats.cache_size_bytes == int(1.5 * 1024**3)
+    assert stats.cache_max_bytes == 2 * 1024**3
+
+
+def test_print_stats_parser_ignores_human_readable_lines():
+    stats = ccache._parse_print_stats("cache hit (direct)                    40\n")
+    assert stats.total_calls == 0
+
+
+def _stats_runner(version):
+    return (
+        FakeRunner()
+        .when("--version", CommandResult(0, stdout=f"ccache version {version}\n"))
+        .when("--print-stats", CommandResult(0, stdout="stats_zeroed_timestamp\t0\n"))
+        .when("--show-stats", CommandResult(0, stdout="cache miss   7\n"))
+    )
+
+
+def test_get_ccache_stats_modern_skips_show_stats(have_ccache):
+    fake = _stats_runner("4.9.1")
+    runner.set_runner(fake)
+
+    stats = ccache.get_ccache_stats()
+    assert stats is not None and stats.total_calls == 0
+    ccache.get_ccache_stats()
+    assert fake.count(token="--show-stats") == 0
+    assert fake.count(token="--version") == 1
+
+
+def test_get_ccache_stats_legacy_falls_back_to_show_stats(have_ccache):
+    runner.set_runner(_stats_runner("3.7.12"))
+
+    stats = ccache.get_ccache_stats()
+    assert stats is not None and stats.cache_miss == 7
+
+
+def test_ccache_env_sets_statslog(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    env = ccache.get_ccache_env()
+    assert env["CCACHE_STATSLOG"] == str(tmp_path / "kalico-flash" / "stats.log")
+    assert env["CCACHE_NOHASHDIR"] == "1"  # scoped to kflash builds, not ccache.conf
+    assert ("hash_dir", "false") not in ccache.get_ccache_config_commands()
+
+
+def test_statslog_delta_counts_only_new_results(have_ccache, monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    runner.set_runner(_stats_runner("4.9.1"))
+    log = ccache.get_ccache_statslog_path()
+    log.parent.mkdir(parents=True)
+    log.write_text("# old.c\ncache_miss\n")
+
+    offset = ccache.statslog_offset()
+    with log.open("a") as f:
+        f.write("# a.c\ndirect_cache_hit\n# b.c\npreprocessed_cache_hit\n# c.c\ncache_miss\n")
+
+    stats = ccache.read_statslog_since(offset)
+    assert stats is not None
+    assert (stats.cache_hit_direct, stats.cache_hit_preprocessed, stats.cache_miss) == (1, 1, 1)
+
+
+def test_statslog_unsupported_on_legacy_ccache(have_ccache):
+    runner.set_runner(_stats_runner("3.7.12"))
+    assert ccache.statslog_offset() is None
+
+
+def test_setup_symlinks_is_idempotent_and_repairs(have_ccache, monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    bin_dir = ccache.get_ccache_bin_dir()
+    bin_dir.mkdir(parents=True)
+    (bin_dir / "arm-none-eabi-gcc").write_text("not a link")
+    (bin_dir / "arm-none-eabi-g++").symlink_to("/usr/bin/gcc")
+
+    assert ccache.setup_ccache_symlinks()
+    assert ccache.setup_ccache_symlinks()
+    for name in ("arm-none-eabi-gcc", "arm-none-eabi-g++"):
+        assert (bin_dir / name).is_symlink()
+        assert str((bin_dir / name).readlink()) == "/usr/bin/ccache"
+
+
+def test_ccache_bin_dir_follows_xdg_changes(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "a"))
+    first = ccache.get_ccache_bin_dir()
+    assert ccache.get_ccache_bin_dir() is first  # memoized
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "b"))
+    assert ccache.get_ccache_bin_dir() == tmp_path / "b" / "kalico-flash" / "ccache-bin"
+
+
+def test_statslog_truncated_once_over_limit(have_ccache, monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    monkeypatch.setattr(ccache, "STATSLOG_MAX_BYTES", 16)
+    runner.set_runner(_stats_runner("4.9.1"))
+    log = ccache.get_ccache_statslog_path()
+    log.parent.mkdir(parents=True)
+    log.write_text("# old.c\ncache_miss\n" * 4)
+
+    assert ccache.statslog_offset() == 0
+    assert log.stat().st_size == 0
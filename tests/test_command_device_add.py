@@ -166,7 +166,7 @@ def _setup(monkeypatch, tmp_path, default_config_text: Optional[str]):
         dadd, "generate_serial_pattern", lambda name: "usb-Klipper_stm32h723xx_TEST01*"
     )
     monkeypatch.setattr(dadd, "get_mcu_serial_map", lambda: None)
-    monkeypatch.setattr(dadd, "prefix_variants", lambda pattern: [pattern])
+    monkeypatch.setattr(dadd, "prefix_variants", lambda pattern: (pattern,))
 
     return registry, klipper_dir, selected
 
@@ -8,6 +8,7 @@ Covers the pure list-shaping helpers used by ``cmd_flash_all``:
 
 from __future__ import annotations
 
+import contextlib
 import types
 
 from conftest import FakeDecisionProvider, RecordingSink
@@ -20,7 +21,7 @@ from kflash.commands.flash_batch import (
     cmd_flash_all,
 )
 from kflash.events import Emitter, NullSink
-from kflash.models import DeviceEntry, GlobalConfig, RegistryData
+from kflash.models import DeviceEntry, DiscoveredDevice, GlobalConfig, RegistryData
 
 
 def _usb(key):
@@ -99,9 +100,14 @@ def test_dedupe_empty_list():
 class _FakeConfigManager:
     seeded_keys: set = set()  # tests mutate this per-case; reset in each test
 
+    config_bytes: dict = {}  # key -> cached .config contents (default: unique per key)
+
     def __init__(self, key, klipper_dir):
         self.key = key
-        self.cache_path = types.SimpleNamespace(exists=lambda: True)
+        self.cache_path = types.SimpleNamespace(
+            exists=lambda: True,
+            read_bytes=lambda: self.config_bytes.get(key, key.encode()),
+        )
 
     def is_seeded(self):
         return self.key in self.seeded_keys
@@ -109,7 +115,7 @@ class _FakeConfigManager:
     def load_cached_config(self):
         return True
 
-    def validate_mcu(self, mcu):
+    def validate_cached_mcu(self, mcu):
         return (True, mcu)
 
     def get_cache_age_display(self):
@@ -143,6 +149,37 @@ def _reach_version_stage(monkeypatch, *, outdated):
     monkeypatch.setattr(flash_batch, "is_mcu_outdated", lambda host, mcu: outdated)
 
 
+def _failing_build(*args, **kwargs):
+    return types.SimpleNamespace(
+        success=False, error_message="stop", error_output="", firmware_path=None
+    )
+
+
+def _image_build(image):
+    """run_build stand-in that reports *image* as every device's firmware."""
+    return lambda *a, **k: types.SimpleNamespace(
+        success=True, firmware_path=str(image), firmware_size=2, ccache_stats=None
+    )
+
+
+def _stub_build_stage(monkeypatch, build):
+    """Run Stage 3 through *build* (a run_build stand-in) with its safety
+    checks stubbed; returns the MCU versions later passed to detect_downgrade."""
+    monkeypatch.setattr(flash_batch, "run_build", build)
+    monkeypatch.setattr(flash_batch, "check_firmware_artifact", lambda path, size: (None, None))
+    monkeypatch.setattr(flash_batch, "resolve_ccache_usage", lambda **k: False)
+    monkeypatch.setattr(
+        flash_batch, "check_dirty_repo", lambda v: types.SimpleNamespace(is_dirty=False)
+    )
+    checked = []
+    monkeypatch.setattr(
+        flash_batch,
+        "detect_downgrade",
+        lambda host, mcu: checked.append(mcu) or types.SimpleNamespace(is_downgrade=False),
+    )
+    return checked
+
+
 def _registry_one_usb():
     entry = DeviceEntry(
         key="octo", name="Octopus", mcu="stm32h723", serial_pattern="usb-Klipper_x*"
@@ -200,6 +237,122 @@ def test_all_up_to_date_confirm_true_proceeds_past_version_gate(monkeypatch):
     assert "flash_all_older_versions" in ids
 
 
+def test_version_and_config_lookups_reused_across_stages(monkeypatch):
+    _reach_version_stage(monkeypatch, outdated=True)
+    monkeypatch.setattr(_FakeConfigManager, "seeded_keys", set())
+    lookups = []
+
+    def _lookup(*args, **kwargs):
+        lookups.append(kwargs["_mcu_versions"])
+        return "v0.13.0-1"
+
+    monkeypatch.setattr(flash_batch, "get_mcu_version_for_device", _lookup)
+    checked = _stub_build_stage(monkeypatch, _failing_build)
+
+    created = []
+    monkeypatch.setattr(
+        flash_batch,
+        "ConfigManager",
+        lambda key, kd: created.append(key) or _FakeConfigManager(key, kd),
+    )
+
+    rc = cmd_flash_all(_registry_two_usb(), Emitter(NullSink()), FakeDecisionProvider())
+
+    assert rc == 1
+    assert sorted(created) == ["nite", "octo"]  # one manager per device, all stages
+    # One lookup per device against the fetched map, reused by the downgrade check
+    assert lookups == [{"mcu": "v0.12.0-100"}] * 2
+    assert checked == ["v0.13.0-1"] * 2
+
+
+def test_can_device_without_uuid_mapping_skips_both_version_checks(monkeypatch):
+    _reach_version_stage(monkeypatch, outdated=True)
+    monkeypatch.setattr(_FakeConfigManager, "seeded_keys", set())
+    monkeypatch.setattr(flash_batch, "get_mcu_canbus_map", lambda: {})
+    lookups = []
+
+    def _lookup(*args, **kwargs):
+        lookups.append(kwargs.get("device_key"))
+        return "v0.13.0-1"
+
+    monkeypatch.setattr(flash_batch, "get_mcu_version_for_device", _lookup)
+    checked = _stub_build_stage(monkeypatch, _failing_build)
+    data = _registry_one_usb().load()
+    data.devices["tool"] = _can("tool", role="toolhead")
+    sink = RecordingSink()
+
+    rc = cmd_flash_all(_FakeRegistry(data), Emitter(sink), FakeDecisionProvider())
+
+    assert rc == 1
+    assert lookups == ["octo"]  # the CAN device is never resolved by MCU type
+    assert checked == ["v0.13.0-1"]  # ...nor downgrade-checked
+    assert "unknown version" in sink.text()
+
+
+def test_identical_configs_build_once(monkeypatch, tmp_path):
+    _reach_version_stage(monkeypatch, outdated=True)
+    monkeypatch.setattr(_FakeConfigManager, "seeded_keys", set())
+    monkeypatch.setattr(_FakeConfigManager, "config_bytes", {"octo": b"same", "nite": b"same"})
+    image = tmp_path / "klipper.uf2"
+    image.write_bytes(b"fw")
+    builds = []
+    build = _image_build(image)
+    _stub_build_stage(monkeypatch, lambda *a, **k: builds.append(1) or build())
+    # Stop right after Stage 3 by failing the sudo gate
+    monkeypatch.setattr(flash_batch, "_is_service_active", lambda: True)
+    monkeypatch.setattr(flash_batch, "verify_passwordless_sudo", lambda: False)
+    monkeypatch.setattr(flash_batch, "acquire_sudo", lambda: False)
+    sink = RecordingSink()
+
+    rc = cmd_flash_all(_registry_two_usb(), Emitter(sink), FakeDecisionProvider())
+
+    assert rc == 1
+    assert len(builds) == 1
+    assert "same config as Nitehawk" in sink.text()  # nite sorts first
+
+
+def test_first_usb_lookup_uses_scan_index_until_rescan(monkeypatch, tmp_path):
+    _reach_version_stage(monkeypatch, outdated=True)
+    monkeypatch.setattr(_FakeConfigManager, "seeded_keys", set())
+    image = tmp_path / "klipper.bin"
+    image.write_bytes(b"fw")
+    _stub_build_stage(monkeypatch, _image_build(image))
+    monkeypatch.setattr(flash_batch, "_is_service_active", lambda: False)
+    monkeypatch.setattr(flash_batch, "refresh_sudo_timestamp", lambda: None)
+    monkeypatch.setattr(
+        flash_batch,
+        "klipper_service_stopped",
+        lambda em: contextlib.nullcontext(types.SimpleNamespace(will_restart=False)),
+    )
+    devices = [
+        DiscoveredDevice(path=f"/dev/serial/by-id/usb-Klipper_{c}1", filename=f"usb-Klipper_{c}1")
+        for c in "xy"
+    ]
+    monkeypatch.setattr(flash_batch, "scan_serial_devices", lambda: list(devices))
+    monkeypatch.setattr(flash_batch, "get_device_flash_config_issue", lambda entry: None)
+    monkeypatch.setattr(flash_batch, "preflight_flash", lambda em, kd, katd, method: True)
+    linear = []
+    real_match_device = flash_batch.match_device
+
+    def _match_device(pattern, usb_devices):
+        linear.append(pattern)
+        return real_match_device(pattern, usb_devices)
+
+    monkeypatch.setattr(flash_batch, "match_device", _match_device)
+    flashed = []
+    monkeypatch.setattr(
+        flash_batch,
+        "run_flash_sequence",
+        lambda **k: flashed.append(k["device_path"])
+        or types.SimpleNamespace(bootloader_ok=False, error_message="x"),
+    )
+
+    cmd_flash_all(_registry_two_usb(), Emitter(NullSink()), FakeDecisionProvider())
+
+    # nite (first) is found via the post-stop index; octo follows a rescan
+    assert flashed == [devices[1].path, devices[0].path]
+    assert linear == ["usb-Klipper_x*"]
+
 # ---------------------------------------------------------------------------
 # Seeded-but-unreviewed configs are skipped by Flash All (review gate parity)
 # ---------------------------------------------------------------------------
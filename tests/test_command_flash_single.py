@@ -53,7 +53,7 @@ def _reach_build_stage(monkeypatch, build_result):
         filename="usb-Klipper_stm32h723xx_ABC123-if00",
     )
     monkeypatch.setattr(flash_single, "scan_serial_devices", lambda: [device])
-    monkeypatch.setattr(flash_single, "match_devices", lambda pattern, devices: [])
+    monkeypatch.setattr(flash_single, "match_registered_devices", lambda devices, registry: {})
     monkeypatch.setattr(flash_single, "match_device", lambda pattern, devices: device)
     monkeypatch.setattr(flash_single, "extract_mcu_from_serial", lambda filename: None)
     monkeypatch.setattr(flash_single, "build_blocked_list", lambda data: {})
@@ -140,3 +140,83 @@ def test_build_success_emits_no_tail_lines(monkeypatch):
 
     build_info_events = [e for e in sink.events if e.kind == "info" and e.section == "Build"]
     assert build_info_events == []
+
+
+def test_interactive_blocked_device_reported_from_single_registry_match(monkeypatch):
+    entry = _entry()
+    device = DiscoveredDevice(
+        path="/dev/serial/by-id/usb-Klipper_stm32h723xx_ABC123-if00",
+        filename="usb-Klipper_stm32h723xx_ABC123-if00",
+    )
+    calls = []
+
+    def _find(devices, registry_devices):
+        calls.append(1)
+        return [(entry, device)], []
+
+    monkeypatch.setattr(flash_single.sys.stdin, "isatty", lambda: True)
+    monkeypatch.setattr(flash_single, "scan_serial_devices", lambda: [device])
+    monkeypatch.setattr(flash_single, "find_registered_devices", _find)
+    monkeypatch.setattr(flash_single, "blocked_reason_for_entry", lambda e, bl: "No thanks")
+    monkeypatch.setattr(flash_single, "get_mcu_versions", lambda: {})
+    monkeypatch.setattr(flash_single, "get_host_klipper_version", lambda kd: None)
+
+    sink = RecordingSink()
+    rc = cmd_flash(_registry_one_usb(entry), None, Emitter(sink), FakeDecisionProvider())
+
+    assert rc == 1
+    blocked = [(e.name, e.detail) for e in sink.events if e.kind == "device_line"]
+    assert blocked == [("Octopus (stm32h723) [blocked]", "No thanks")]
+    assert len(calls) == 1
+
+
+def test_mcu_version_looked_up_once_from_fetched_snapshot(monkeypatch):
+    entry = _entry()
+    entry.mcu_name = "mcu octo"
+    device = DiscoveredDevice(
+        path="/dev/serial/by-id/usb-Klipper_stm32h723xx_ABC123-if00",
+        filename="usb-Klipper_stm32h723xx_ABC123-if00",
+    )
+    build_result = types.SimpleNamespace(
+        success=False, error_message="boom", error_output="", firmware_path=None
+    )
+    _reach_build_stage(monkeypatch, build_result)
+    monkeypatch.setattr(flash_single.sys.stdin, "isatty", lambda: True)
+    monkeypatch.setattr(
+        flash_single, "find_registered_devices", lambda devices, reg: ([(entry, device)], [])
+    )
+    monkeypatch.setattr(flash_single, "get_mcu_versions", lambda: {"octo": "v0.12.0-1-gaaa"})
+    monkeypatch.setattr(flash_single, "get_host_klipper_version", lambda kd: "v0.12.0-9-gbbb")
+    lookups = []
+    real_lookup = flash_single.get_mcu_version_for_device
+
+    def _lookup(*args, **kwargs):
+        lookups.append(kwargs["_mcu_versions"])
+        return real_lookup(*args, **kwargs)
+
+    monkeypatch.setattr(flash_single, "get_mcu_version_for_device", _lookup)
+
+    sink = RecordingSink()
+    rc = cmd_flash(_registry_one_usb(entry), None, Emitter(sink), FakeDecisionProvider())
+
+    assert rc == 1
+    assert lookups == [{"octo": "v0.12.0-1-gaaa"}]
+    assert any("v0.12.0-1-gaaa" in e.message for e in sink.events if e.kind == "info")
+
+
+def test_explicit_key_reads_registry_once(monkeypatch):
+    entry = _entry()
+    build_result = types.SimpleNamespace(
+        success=False, error_message="boom", error_output="", firmware_path=None
+    )
+    _reach_build_stage(monkeypatch, build_result)
+    registry = _registry_one_usb(entry)
+    reads = []
+    load = registry.load
+    monkeypatch.setattr(registry, "load", lambda: reads.append("load") or load())
+    monkeypatch.setattr(registry, "get", lambda key: reads.append("get"))
+
+    rc = cmd_flash(registry, entry.key, Emitter(RecordingSink()), FakeDecisionProvider())
+
+    assert rc == 1
+    assert reads == ["load"]
@@ -315,3 +315,116 @@ class TestSaveAsDefault:
         from kflash.errors import ConfigError
         with pytest.raises(ConfigError):
             make_mgr().save_cache_as_default("stm32h723")
+
+
+class TestAtomicCopy:
+    def test_copies_contents_and_replaces_destination(self, tmp_path):
+        from kflash.config import _atomic_copy
+
+        src = tmp_path / "src.config"
+        src.write_bytes(b"CONFIG_MCU=\"rp2040\"\n" * 2000)
+        dst = tmp_path / "out" / "dst.config"
+        _atomic_copy(str(src), str(dst))
+        _atomic_copy(str(src), str(dst))
+        assert dst.read_bytes() == src.read_bytes()
+        assert [p.name for p in dst.parent.iterdir()] == ["dst.config"]
+
+    def test_falls_back_when_sendfile_refused(self, tmp_path, monkeypatch):
+        import os
+
+        from kflash.config import _atomic_copy
+
+        def refuse(*args):
+            raise OSError("sendfile not supported")
+
+        monkeypatch.setattr(os, "sendfile", refuse)
+        src = tmp_path / "src.config"
+        src.write_bytes(b"CONFIG_MACH_STM32=y\n")
+        dst = tmp_path / "dst.config"
+        _atomic_copy(str(src), str(dst))
+        assert dst.read_bytes() == b"CONFIG_MACH_STM32=y\n"
+
+
+class TestPageCacheAdvice:
+    def test_page_cache_dropped_only_when_loading(self, env, monkeypatch):
+        from kflash import config as config_mod
+
+        dropped = []
+        monkeypatch.setattr(config_mod, "_drop_page_cache", dropped.append)
+        make_mgr, _ = env
+        mgr = make_mgr()
+        mgr.klipper_config_path.write_text('CONFIG_MCU="rp2040"\n')
+        mgr.save_cached_config()
+        assert dropped == []  # make reads klipper/.config next; keep it cached
+        assert mgr.load_cached_config()
+        assert len(dropped) == 1
+
+
+class TestParseMcuFromConfig:
+    def test_mcu_line_wins(self, tmp_path):
+        from kflash.config import parse_mcu_from_config
+
+        cfg = tmp_path / ".config"
+        cfg.write_text(
+            'CONFIG_BOARD_DIRECTORY="stm32"\n# CONFIG_MCU="ignored"\nCONFIG_MCU="stm32h723xx"\n',
+            encoding="utf-8",
+        )
+        assert parse_mcu_from_config(str(cfg)) == "stm32h723xx"
+
+    def test_board_directory_fallback(self, tmp_path):
+        from kflash.config import parse_mcu_from_config
+
+        cfg = tmp_path / ".config"
+        cfg.write_text('CONFIG_MACH_RP2040=y\nCONFIG_BOARD_DIRECTORY="rp2040"\n', encoding="utf-8")
+        assert parse_mcu_from_config(str(cfg)) == "rp2040"
+
+    def test_missing_or_empty_is_none(self, tmp_path):
+        from kflash.config import parse_mcu_from_config
+
+        cfg = tmp_path / ".config"
+        assert parse_mcu_from_config(str(cfg)) is None
+        cfg.write_text('CONFIG_MCU=""\n', encoding="utf-8")
+        assert parse_mcu_from_config(str(cfg)) is None
+
+
+class TestMtime:
+    def test_get_mtime_none_until_config_exists(self, env):
+        make_mgr, _ = env
+        mgr = make_mgr()
+        assert mgr.get_mtime() is None
+        assert mgr.get_cache_mtime() is None
+        mgr.klipper_config_path.write_text("CONFIG_MCU=\"rp2040\"\n", encoding="utf-8")
+        assert mgr.get_mtime() == mgr.klipper_config_path.stat().st_mtime
+
+
+class TestValidateMcu:
+    def test_missing_config_raises(self, env):
+        from kflash.errors import ConfigError
+
+        make_mgr, _ = env
+        with pytest.raises(ConfigError):
+            make_mgr().validate_mcu("stm32h723")
+
+    def test_prefix_match_and_unknown(self, env):
+        make_mgr, _ = env
+        mgr = make_mgr()
+        mgr.klipper_config_path.write_text(
+            'CONFIG_MCU=""\nCONFIG_MCU="stm32h723xx"\n', encoding="utf-8"
+        )
+        assert mgr.validate_mcu("stm32h723") == (True, "stm32h723xx")
+        assert mgr.validate_mcu("rp2040") == (False, "stm32h723xx")
+        mgr.klipper_config_path.write_text("", encoding="utf-8")
+        assert mgr.validate_mcu("rp2040") == (False, "unknown")
+
+    def test_cached_config_validated_in_place(self, env):
+        from kflash.errors import ConfigError
+
+        make_mgr, _ = env
+        mgr = make_mgr()
+        with pytest.raises(ConfigError):
+            mgr.validate_cached_mcu("stm32h723")
+        mgr.cache_path.parent.mkdir(parents=True)
+        mgr.cache_path.write_text('CONFIG_MCU="stm32h723xx"\n', encoding="utf-8")
+        assert mgr.validate_cached_mcu("stm32h723") == (True, "stm32h723xx")
+        assert mgr.validate_cached_mcu("rp2040") == (False, "stm32h723xx")
+        assert not mgr.klipper_config_path.exists()
@@ -9,10 +9,17 @@ are pure and require no real ``/dev`` access.
 
 from __future__ import annotations
 
+import socket
+import struct
+
 import pytest
+from conftest import FakeRunner
 
+from kflash import _canbus, _netlink, runner
 from kflash import discovery as d
+from kflash._netlink import LinkInfo
 from kflash.models import DeviceEntry, DiscoveredDevice
+from kflash.runner import CommandResult
 
 
 def _dev(filename: str) -> DiscoveredDevice:
@@ -32,18 +39,18 @@ BEACON = "usb-Beacon_Beacon_RevH_FC2A6E-if00"
 
 def test_prefix_variants_klipper_generates_katapult_alt():
     variants = d.prefix_variants("usb-Klipper_stm32h723xx_29001A*")
-    assert variants == [
+    assert variants == (
         "usb-Klipper_stm32h723xx_29001A*",
         "usb-katapult_stm32h723xx_29001A*",
-    ]
+    )
 
 
 def test_prefix_variants_katapult_generates_klipper_alt():
     variants = d.prefix_variants("usb-katapult_stm32h723xx_29001A*")
-    assert variants == [
+    assert variants == (
         "usb-katapult_stm32h723xx_29001A*",
         "usb-Klipper_stm32h723xx_29001A*",
-    ]
+    )
 
 
 def test_prefix_variants_lowercase_klipper_prefix_detected():
@@ -54,7 +61,12 @@ def test_prefix_variants_lowercase_klipper_prefix_detected():
 
 
 def test_prefix_variants_unknown_prefix_passthrough():
-    assert d.prefix_variants("usb-Beacon_xyz*") == ["usb-Beacon_xyz*"]
+    assert d.prefix_variants("usb-Beacon_xyz*") == ("usb-Beacon_xyz*",)
+
+
+def test_prefix_variants_prefix_only_patterns():
+    assert d.prefix_variants("USB-KATAPULT_") == ("USB-KATAPULT_", "usb-Klipper_")
+    assert d.prefix_variants("usb-klip") == ("usb-klip",)
 
 
 # ---------------------------------------------------------------------------
@@ -101,6 +113,43 @@ def test_match_device_returns_first_or_none():
     assert d.match_device("usb-Klipper_rp2040_*", devices) is None
 
 
+def test_match_device_stops_at_first_hit():
+    class _Untouchable:
+        @property
+        def filename(self):
+            raise AssertionError("scanned past the first match")
+
+    first = _dev(KATAPULT_H723)
+    assert d.match_device("usb-Klipper_stm32h723xx_29001A*", [first, _Untouchable()]) is first
+
+
+def test_pattern_matches_is_case_sensitive_like_posix_fnmatch():
+    assert d.pattern_matches("usb-Klipper_stm32h723xx_29001A*", KATAPULT_H723)
+    assert not d.pattern_matches("usb-Klipper_STM32H723XX_29001A*", KLIPPER_H723)
+    assert d._compiled_variants("usb-Klipper_rp2040_*") is d._compiled_variants(
+        "usb-Klipper_rp2040_*"
+    )
+
+
+# ---------------------------------------------------------------------------
+# scan_serial_devices
+# ---------------------------------------------------------------------------
+
+
+def test_scan_serial_devices_sorted_by_name(tmp_path, monkeypatch):
+    for name in (KLIPPER_H723, BEACON, KATAPULT_H723):
+        (tmp_path / name).touch()
+    monkeypatch.setattr(d, "SERIAL_BY_ID", str(tmp_path))
+    devices = d.scan_serial_devices()
+    assert [dev.filename for dev in devices] == sorted([KLIPPER_H723, BEACON, KATAPULT_H723])
+    assert devices[0].path == str(tmp_path / devices[0].filename)
+
+
+def test_scan_serial_devices_missing_dir_is_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(d, "SERIAL_BY_ID", str(tmp_path / "by-id"))
+    assert d.scan_serial_devices() == []
+
+
 # ---------------------------------------------------------------------------
 # is_supported_device
 # ---------------------------------------------------------------------------
@@ -168,6 +217,55 @@ def test_find_registered_devices_prefix_flip():
     assert unmatched == []
 
 
+def test_find_registered_devices_picks_first_in_scan_order():
+    h723 = DeviceEntry(
+        key="octopus", name="Octopus", mcu="stm32h723", serial_pattern="usb-Klipper_stm32*"
+    )
+    rp = DeviceEntry(key="pico", name="Pico", mcu="rp2040", serial_pattern="usb-*rp2040*")
+    # Scan order differs from filename order; the first scanned match wins.
+    devices = [_dev(KLIPPER_RP2040), _dev(KATAPULT_H723), _dev(KLIPPER_H723), _dev(BEACON)]
+    matched, unmatched = d.find_registered_devices(devices, {"octopus": h723, "pico": rp})
+    assert [(e.key, dev.filename) for e, dev in matched] == [
+        ("octopus", KATAPULT_H723),
+        ("pico", KLIPPER_RP2040),
+    ]
+    assert [u.filename for u in unmatched] == [KLIPPER_H723, BEACON]
+
+
+def test_find_registered_devices_overlapping_patterns_each_match():
+    # One device may satisfy several entries; every entry reports it, which a
+    # single combined alternation (first alternative wins) could not express.
+    broad = DeviceEntry(key="any", name="Any", mcu="stm32h723", serial_pattern="usb-Klipper_*")
+    exact = DeviceEntry(
+        key="octopus", name="Octopus", mcu="stm32h723", serial_pattern=KLIPPER_H723
+    )
+    matched, unmatched = d.find_registered_devices(
+        [_dev(KLIPPER_H723)], {"any": broad, "octopus": exact}
+    )
+    assert [(e.key, dev.filename) for e, dev in matched] == [
+        ("any", KLIPPER_H723),
+        ("octopus", KLIPPER_H723),
+    ]
+    assert unmatched == []
+
+
+def test_match_registered_devices_agrees_with_match_devices():
+    h723 = DeviceEntry(
+        key="octopus", name="O", mcu="stm32h723", serial_pattern="usb-Klipper_*h723*"
+    )
+    rp = DeviceEntry(key="pico", name="P", mcu="rp2040", serial_pattern="usb-*rp2040*")
+    can = DeviceEntry(key="nhk", name="N", mcu="stm32g0b1", canbus_uuid="48ca7afe7a44")
+    devices = [_dev(KLIPPER_RP2040), _dev(KATAPULT_H723), _dev(BEACON), _dev(KLIPPER_H723)]
+    registry = {"octopus": h723, "pico": rp, "nhk": can}
+
+    by_key = d.match_registered_devices(devices, registry)
+    assert by_key == {
+        "octopus": d.match_devices(h723.serial_pattern, devices),
+        "pico": d.match_devices(rp.serial_pattern, devices),
+    }
+    assert [dev.filename for dev in by_key["octopus"]] == [KATAPULT_H723, KLIPPER_H723]
+
+
 # ---------------------------------------------------------------------------
 # extract_mcu_from_serial
 # ---------------------------------------------------------------------------
@@ -217,6 +315,12 @@ def test_parse_can_query_output_single():
     assert result[0].application == "Katapult"
 
 
+def test_parse_can_query_output_bytes_matches_text():
+    out = "junk \xff\nDetected UUID: 48ca7afe7a44, Application: Katapult\n"
+    raw = out.encode("latin-1")
+    assert d.parse_can_query_output(raw) == d.parse_can_query_output(out)
+
+
 def test_parse_can_query_output_multiple():
     out = (
         "Query Complete\n"
@@ -252,3 +356,213 @@ def test_is_katapult_device_false_for_klipper_and_foreign_devices():
     assert not d.is_katapult_device("usb-Klipper_rp2040_ABC123-if00")
     assert not d.is_katapult_device("usb-Beacon_Beacon_RevH_FC2-if00")
     assert not d.is_katapult_device("")
+
+
+# ---------------------------------------------------------------------------
+# CAN interfaces from sysfs
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def sysfs_only(monkeypatch):
+    """Force the sysfs fallback (no netlink) for CAN interface checks."""
+    monkeypatch.setattr(d, "_link_snapshot", lambda: None)
+
+
+def _fake_sysfs_net(root, ifaces):
+    for name, attrs in ifaces.items():
+        (root / name).mkdir(parents=True)
+        for attr, value in attrs.items():
+            (root / name / attr).write_text(f"{value}\n")
+
+
+def test_get_can_interfaces_filters_name_and_type(tmp_path, monkeypatch, sysfs_only):
+    _fake_sysfs_net(
+        tmp_path,
+        {
+            "can1": {"type": 280},
+            "can0": {"type": 280},
+            "vcan0": {"type": 280},
+            "can9": {"type": 1},
+            "eth0": {"type": 1},
+        },
+    )
+    monkeypatch.setattr(d, "_SYSFS_NET", str(tmp_path))
+    assert d.get_can_interfaces() == ["can0", "can1"]
+
+
+def test_get_can_interfaces_reuses_recent_scan(tmp_path, monkeypatch, sysfs_only):
+    _fake_sysfs_net(tmp_path, {"can0": {"type": 280}})
+    monkeypatch.setattr(d, "_SYSFS_NET", str(tmp_path))
+    assert d.get_can_interfaces() == ["can0"]
+
+    _fake_sysfs_net(tmp_path, {"can1": {"type": 280}})
+    assert d.get_can_interfaces() == ["can0"]  # within TTL
+    d.reset_caches()
+    assert d.get_can_interfaces() == ["can0", "can1"]
+
+
+def test_get_can_interfaces_missing_sysfs_is_empty(tmp_path, monkeypatch, sysfs_only):
+    monkeypatch.setattr(d, "_SYSFS_NET", str(tmp_path / "missing"))
+    assert d.get_can_interfaces() == []
+
+
+def test_preflight_sysfs_fallback_reports_low_qlen(tmp_path, monkeypatch, sysfs_only):
+    _fake_sysfs_net(tmp_path, {"can0": {"type": 280, "operstate": "up", "tx_queue_len": 10}})
+    monkeypatch.setattr(d, "_SYSFS_NET", str(tmp_path))
+    ok, error = d.preflight_can_interface("can0")
+    assert not ok and "txqueuelen (10)" in error
+
+
+def test_preflight_sysfs_fallback_down_and_ok(tmp_path, monkeypatch, sysfs_only):
+    _fake_sysfs_net(
+        tmp_path,
+        {
+            "can0": {"type": 280, "operstate": "up", "tx_queue_len": 1024},
+            "can1": {"type": 280, "operstate": "down", "tx_queue_len": 1024},
+            "can2": {"type": 280, "operstate": "up"},  # qlen unreadable: not blocking
+        },
+    )
+    monkeypatch.setattr(d, "_SYSFS_NET", str(tmp_path))
+    assert d.preflight_can_interface("can0") == (True, "")
+    ok, error = d.preflight_can_interface("can1")
+    assert not ok and "DOWN" in error
+    assert d.preflight_can_interface("can2") == (True, "")
+
+
+def test_preflight_uses_single_netlink_snapshot(monkeypatch):
+    calls = []
+
+    def snapshot():
+        calls.append(1)
+        return {
+            "can0": LinkInfo(type=280, is_up=True, txqlen=1024),
+            "can1": LinkInfo(type=280, is_up=False, txqlen=1024),
+            "vcan0": LinkInfo(type=280, is_up=True, txqlen=1024),
+        }
+
+    monkeypatch.setattr(d, "_link_snapshot", snapshot)
+    assert d.preflight_can_interface("can0") == (True, "")
+    ok, error = d.preflight_can_interface("can1")
+    assert not ok and "DOWN" in error
+    ok, error = d.preflight_can_interface("vcan0")
+    assert not ok and "Available: can0, can1" in error
+    assert len(calls) == 3
+
+
+def test_parse_links_reads_name_state_and_qlen():
+    def rtattr(kind, payload):
+        raw = struct.pack("=HH", 4 + len(payload), kind) + payload
+        return raw + b"\0" * (-len(raw) % 4)
+
+    body = struct.pack("=BxHiII", 0, 280, 3, 0, 0)
+    body += rtattr(3, b"can0\0") + rtattr(16, bytes([6])) + rtattr(13, struct.pack("=I", 128))
+    msg = struct.pack("=IHHII", 16 + len(body), 16, 2, 1, 0) + body
+    done = struct.pack("=IHHII", 20, 3, 2, 1, 0) + b"\0" * 4
+
+    links = {}
+    assert _netlink.parse_links(msg + done, links)
+    assert links == {"can0": LinkInfo(type=280, is_up=True, txqlen=128)}
+
+
+# ---------------------------------------------------------------------------
+# verify_can_device_after_flash -- direct SocketCAN query
+# ---------------------------------------------------------------------------
+
+
+def _admin_reply(uuid_hex, app_byte):
+    data = bytes([0x20]) + bytes.fromhex(uuid_hex) + bytes([app_byte])
+    return struct.pack("=IB3x8s", 0x3F1, len(data), data)
+
+
+class _FakeCanSocket:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, frame):
+        self.sent.append(frame)
+
+    def settimeout(self, value):
+        pass
+
+    def recv(self, size):
+        if not self.frames:
+            raise socket.timeout
+        return self.frames.pop(0)
+
+
+def test_parse_admin_response_reports_application():
+    dev = _canbus.parse_admin_response(_admin_reply("48ca7afe7a44", 0x11))
+    assert (dev.uuid, dev.application) == ("48ca7afe7a44", "Katapult")
+    assert _canbus.parse_admin_response(b"\x00" * 16) is None
+
+
+def test_verify_can_uses_socket_without_spawning(monkeypatch):
+    sock = _FakeCanSocket(
+        [_admin_reply("aabbccddeeff", 0x01), _admin_reply("48ca7afe7a44", 0x01)]
+    )
+    monkeypatch.setattr(d._canbus, "open_admin_socket", lambda iface: sock)
+    fake = FakeRunner()
+    runner.set_runner(fake)
+
+    ok, reason = d.verify_can_device_after_flash(
+        "48ca7afe7a44", "can0", "/nonexistent", timeout=1.0, poll_interval=0.05
+    )
+    assert ok and reason is None
+    assert fake.calls == []
+    assert sock.sent  # the admin query went out on the bus
+
+
+def test_verify_can_falls_back_to_flashtool_without_socketcan(monkeypatch):
+    def no_socket(iface):
+        raise OSError("no SocketCAN")
+
+    monkeypatch.setattr(d._canbus, "open_admin_socket", no_socket)
+    runner.set_runner(
+        FakeRunner(
+            default=CommandResult(0, stdout="Detected UUID: 48ca7afe7a44, Application: Klipper\n")
+        )
+    )
+    ok, _ = d.verify_can_device_after_flash(
+        "48ca7afe7a44", "can0", "/nonexistent", timeout=1.0, poll_interval=0.01
+    )
+    assert ok
+
+
+def test_scan_can_devices_prefers_socket_query(monkeypatch):
+    sock = _FakeCanSocket([_admin_reply("48ca7afe7a44", 0x11)])
+    monkeypatch.setattr(d._canbus, "open_admin_socket", lambda iface: sock)
+    monkeypatch.setattr(d, "CAN_QUERY_LISTEN", 0.05)
+    fake = FakeRunner()
+    runner.set_runner(fake)
+
+    devices = d.scan_can_devices("can0", "/nonexistent")
+    assert [(x.uuid, x.application) for x in devices] == [("48ca7afe7a44", "Katapult")]
+    assert fake.calls == []
+
+
+def test_scan_can_devices_flashtool_fallback(monkeypatch, tmp_path):
+    def no_socket(iface):
+        raise OSError("no SocketCAN")
+
+    monkeypatch.setattr(d._canbus, "open_admin_socket", no_socket)
+    assert d.scan_can_devices("can0", str(tmp_path)) == []  # flashtool not installed
+
+    flashtool = tmp_path / "scripts" / "flashtool.py"
+    flashtool.parent.mkdir()
+    flashtool.touch()
+    d.reset_caches()
+    fake = FakeRunner(
+        default=CommandResult(0, stdout="Detected UUID: 48ca7afe7a44, Application: Klipper\n")
+    )
+    runner.set_runner(fake)
+    assert [x.uuid for x in d.scan_can_devices("can0", str(tmp_path))] == ["48ca7afe7a44"]
+    assert fake.count(token=str(flashtool)) == 1
+
@@ -52,11 +52,25 @@ def test_format_error_expected_actual_pair():
     assert "expected 'stm32h723' but found 'rp2040'." in out
 
 
+def test_format_error_present_none_values_still_render():
+    out = errors.format_error(
+        "Err", "msg", context={"device": None, "expected": None, "actual": "rp2040"}
+    )
+    assert "Affected: device 'None', expected 'None' but found 'rp2040'." in out
+
+
 def test_format_error_extra_context_keys_included():
     out = errors.format_error("Err", "msg", context={"custom": "value"})
     assert "custom 'value'" in out
 
 
+def test_format_error_extra_keys_keep_order_after_known_keys():
+    out = errors.format_error(
+        "Err", "msg", context={"zeta": "1", "path": "/p", "alpha": "2", "expected": "x"}
+    )
+    assert "Affected: path '/p', zeta '1', alpha '2'." in out
+
+
 def test_format_error_recovery_preserves_numbered_lines():
     recovery = "1. First step\n2. Second step\n3. Third step"
     out = errors.format_error("Err", "msg", recovery=recovery)
@@ -82,6 +96,21 @@ def test_format_error_wraps_long_lines_to_80():
         assert len(line) <= 80
 
 
+@pytest.mark.parametrize(
+    "line",
+    ["a" * 80, "a" * 81, "  indented step", "trailing space ", "tab\there", "x  y", ""]
+    + [
+        line
+        for template in errors.ERROR_TEMPLATES.values()
+        for line in template["recovery_template"].split("\n")
+    ],
+)
+def test_fill_fast_path_matches_textwrap(line):
+    import textwrap
+
+    assert errors._fill(line) == textwrap.fill(line, width=80)
+
+
 def test_format_error_full_structure():
     out = errors.format_error(
         "Flash failed",
@@ -110,3 +139,11 @@ def test_get_recovery_text_returns_template(key):
 def test_get_recovery_text_missing_key_raises():
     with pytest.raises(KeyError):
         errors.get_recovery_text("nonexistent_template")
+
+
+def test_error_fields_live_in_slots():
+    exc = errors.ConfigMismatchError("stm32h723", "rp2040", "octopus")
+    assert (exc.expected_mcu, exc.actual_mcu, exc.device_key) == ("stm32h723", "rp2040", "octopus")
+    assert exc.__dict__ == {}
+    missing = errors.DeviceNotFoundError("octopus", connected=True)
+    assert missing.connected and missing.__dict__ == {}
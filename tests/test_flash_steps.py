@@ -847,6 +847,33 @@ class TestResolveTargetMcuVersion:
         versions = {"main": HOST_VER, "stm32h723xx": HOST_VER}
         assert flash_steps.resolve_target_mcu_version(entry, versions) is None
 
+    def test_legacy_match_is_case_insensitive_and_prefers_friendly_names(self):
+        entry = DeviceEntry(
+            key="ebb",
+            name="EBB36 Toolhead",
+            mcu="STM32G0B1",
+            serial_pattern="usb-Klipper_stm32g0b1xx_ABC123*",
+            mcu_name=None,
+        )
+        versions = {"main": HOST_VER, "stm32g0b1xx": NHK_VER, "TOOLHEAD": NHK_VER}
+        assert flash_steps.resolve_target_mcu_version(entry, versions) == "TOOLHEAD"
+        entry.name = entry.key = "Nozzle"
+        versions = {"main": HOST_VER, "stm32g0b1xx": NHK_VER, "stm32g0b1": NHK_VER}
+        assert flash_steps.resolve_target_mcu_version(entry, versions) == "stm32g0b1xx"
+
+    def test_legacy_match_is_substring_not_prefix(self):
+        entry = DeviceEntry(
+            key="btt-ebb36",
+            name="BTT EBB36",
+            mcu="g0b1",
+            serial_pattern="usb-Klipper_stm32g0b1xx_ABC123*",
+            mcu_name=None,
+        )
+        assert flash_steps.resolve_target_mcu_version(entry, {"ebb": NHK_VER}) == "ebb"
+        entry.name = entry.key = "Nozzle"
+        versions = {"main": HOST_VER, "stm32g0b1xx": NHK_VER}
+        assert flash_steps.resolve_target_mcu_version(entry, versions) == "stm32g0b1xx"
+
 
 class TestEmitHostAndMcuVersions:
     def test_warns_when_target_unknown(self):
@@ -861,6 +888,14 @@ class TestEmitHostAndMcuVersions:
         flash_steps.emit_host_and_mcu_versions(em, HOST_VER, {"main": HOST_VER}, "main")
         assert "not reported" not in sink.text()
 
+    def test_lists_friendly_names_and_marks_chip_alias_target(self):
+        sink = RecordingSink()
+        em = Emitter(sink)
+        versions = {"nhk": NHK_VER, "rp2040": NHK_VER, "main": HOST_VER, "stm32h723xx": HOST_VER}
+        flash_steps.emit_host_and_mcu_versions(em, HOST_VER, versions, "rp2040")
+        lines = [e.message for e in sink.events if e.kind == "phase"][1:]
+        assert lines == [f"  [ ] MCU main: {HOST_VER}", f"  [*] MCU nhk: {NHK_VER}"]
+
 
 # ---------------------------------------------------------------------------
 # Already-in-bootloader first-flash skip (bare Katapult device)
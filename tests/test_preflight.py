@@ -0,0 +1,84 @@
+"""Tier-1 tests for kflash.preflight tool checks.
+
+``shutil.which`` is monkeypatched; the Klipper directory is a tmp_path with
+an empty Makefile.
+"""
+
+from __future__ import annotations
+
+from conftest import RecordingSink
+
+from kflash import preflight
+from kflash.events import Emitter
+
+
+def _klipper(tmp_path):
+    (tmp_path / "Makefile").touch()
+    return str(tmp_path)
+
+
+def test_tool_lookups_are_memoized_across_preflights(monkeypatch, tmp_path):
+    lookups = []
+
+    def _which(name):
+        lookups.append(name)
+        return f"/usr/bin/{name}"
+
+    monkeypatch.setattr(preflight.shutil, "which", _which)
+    em = Emitter(RecordingSink())
+    assert preflight.preflight_build(em, _klipper(tmp_path))
+    assert preflight.preflight_build(em, _klipper(tmp_path))
+    assert lookups == ["make", "arm-none-eabi-gcc"]
+
+
+def test_failed_preflight_rechecks_tools_on_retry(monkeypatch, tmp_path):
+    installed = set()
+    monkeypatch.setattr(
+        preflight.shutil, "which", lambda name: f"/usr/bin/{name}" if name in installed else None
+    )
+    sink = RecordingSink()
+    installed.add("make")
+    assert not preflight.preflight_build(Emitter(sink), _klipper(tmp_path))
+    assert "arm-none-eabi-gcc" in sink.text()
+
+    installed.add("arm-none-eabi-gcc")
+    assert preflight.preflight_build(Emitter(sink), _klipper(tmp_path))
+
+
+def test_preflight_flash_sdcard_script_resolved_under_klipper_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(preflight.shutil, "which", lambda name: f"/usr/bin/{name}")
+    sink = RecordingSink()
+    klipper = _klipper(tmp_path)
+    assert not preflight.preflight_flash(Emitter(sink), klipper, str(tmp_path), "flash_sdcard")
+    assert f"flash-sdcard.sh not found at {tmp_path / 'scripts'}" in sink.text()
+
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "flash-sdcard.sh").touch()
+    assert preflight.preflight_flash(Emitter(sink), klipper, str(tmp_path), "flash_sdcard")
+
+
+def test_preflight_flash_katapult_variants_name_their_purpose(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        preflight.shutil, "which", lambda name: None if name == "python3" else f"/usr/bin/{name}"
+    )
+    for method, purpose in (("katapult", "Katapult"), ("katapult_can", "CAN flash")):
+        sink = RecordingSink()
+        assert not preflight.preflight_flash(Emitter(sink), _klipper(tmp_path), "/nope", method)
+        assert f"required for {purpose}" in sink.text()
+        assert "flashtool not found at /nope/scripts/flashtool.py" in sink.text()
+
+
+def test_firmware_artifact_trusts_build_size_without_stat(tmp_path):
+    missing = tmp_path / "klipper.bin"
+    assert preflight.check_firmware_artifact(str(missing), 64 * 1024) == (None, None)
+    error, _ = preflight.check_firmware_artifact(str(missing), None)
+    assert error == f"firmware file not found: {missing}"
+    error, _ = preflight.check_firmware_artifact(str(tmp_path), None)  # a directory
+    assert error == f"firmware file not found: {tmp_path}"
+
+
+def test_firmware_artifact_stats_once_when_size_unknown(tmp_path):
+    image = tmp_path / "klipper.bin"
+    image.write_bytes(b"\0" * 100)
+    error, warning = preflight.check_firmware_artifact(str(image), None)
+    assert error is None and "unusually small (100 bytes)" in warning
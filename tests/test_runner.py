@@ -53,6 +53,17 @@ def test_subprocess_runner_captures_stdout():
     assert not res.timed_out
 
 
+def test_subprocess_runner_capture_false_discards_output():
+    runner.set_runner(SubprocessRunner())
+    res = runner.run(
+        [sys.executable, "-c", "import sys; print('out'); sys.exit(4)"],
+        timeout=15,
+        capture=False,
+    )
+    assert res.returncode == 4
+    assert res.stdout == "" and res.stderr == ""
+
+
 def test_subprocess_runner_timeout_sets_timed_out():
     runner.set_runner(SubprocessRunner())
     res = runner.run([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.3)
@@ -107,6 +118,17 @@ def test_run_streaming_lines_delivers_lines_in_order():
     assert not res.timed_out
 
 
+def test_run_streaming_lines_max_lines_keeps_tail_only():
+    r = SubprocessRunner()
+    script = "for i in range(50): print('line%d' % i)"
+    received = []
+    res = r.run_streaming_lines(
+        [sys.executable, "-c", script], timeout=15, on_line=received.append, max_lines=3
+    )
+    assert len(received) == 50  # on_line still sees every line
+    assert res.stdout.splitlines() == ["line47", "line48", "line49"]
+
+
 def test_run_streaming_lines_returncode_passthrough_nonzero():
     r = SubprocessRunner()
     script = "print('boom'); raise SystemExit(3)"
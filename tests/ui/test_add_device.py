@@ -219,7 +219,7 @@ def test_real_cmd_add_device_registers_usb(tmp_path, monkeypatch) -> None:
         dadd, "generate_serial_pattern", lambda name: "usb-Klipper_rp2040_NEW01*"
     )
     monkeypatch.setattr(dadd, "get_mcu_serial_map", lambda: None)
-    monkeypatch.setattr(dadd, "prefix_variants", lambda pattern: [pattern])
+    monkeypatch.setattr(dadd, "prefix_variants", lambda pattern: (pattern,))
 
     async def answer_modals(pilot, app, screen) -> None:
         # Drive whatever modal is up until the wizard completes. The poll can